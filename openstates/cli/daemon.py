@@ -0,0 +1,142 @@
+"""
+keep a warm interpreter around and run os-update jobs from a directory
+
+    os-update-daemon --jobdir jobs/
+
+Jobs are JSON files in the job directory holding the os-update arguments to run:
+
+    {"args": ["nc", "--scrape", "bills", "session=2021"]}
+
+(write them under another name and rename them to {name}.json so they aren't read
+half-written).  Each job is run in a process forked from the daemon, which has already
+set up Django and imported the scraping/import code.  A job is renamed to {name}.running
+while it runs and to {name}.done or {name}.failed after, with its output in {name}.log.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+
+from django.db import connections
+
+from ..utils.django import init_django
+from . import update
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        "os-update-daemon", description="run os-update jobs from a directory"
+    )
+    parser.add_argument("--jobdir", required=True, help="directory to read jobs from")
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=1,
+        help="number of jobs to run at once (default is 1)",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=1.0,
+        help="seconds between checks for new jobs (default is 1)",
+    )
+    parser.add_argument(
+        "--preload",
+        nargs="*",
+        default=[],
+        help="scraper modules to import before forking",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="exit once there are no jobs left"
+    )
+    return parser.parse_args(argv)
+
+
+def warm_up(modules):
+    """ do the expensive setup every job would otherwise repeat """
+    init_django()
+    # importing these pulls in the models, scrapelib, jsonschema, etc.
+    from .. import importers, metadata, scrape  # noqa
+
+    # state metadata is otherwise loaded on first use
+    for abbr in metadata.data.ABBRS:
+        metadata.lookup(abbr=abbr)
+    for module_name in modules:
+        update.get_jurisdiction(module_name)
+    # each job needs its own database connection, don't share ours
+    connections.close_all()
+
+
+def claim_jobs(jobdir):
+    """ claim pending jobs by renaming {name}.json to {name}.running """
+    for fname in sorted(glob.glob(os.path.join(jobdir, "*.json"))):
+        running = fname[: -len(".json")] + ".running"
+        try:
+            os.rename(fname, running)
+        except FileNotFoundError:
+            # claimed by another daemon
+            continue
+        yield running
+
+
+def start_job(jobfile):
+    """ run a job in a forked process, returning its pid """
+    pid = os.fork()
+    if pid:
+        return pid
+
+    code = 1
+    try:
+        base = jobfile[: -len(".running")]
+        logfd = os.open(base + ".log", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.dup2(logfd, sys.stdout.fileno())
+        os.dup2(logfd, sys.stderr.fileno())
+        with open(jobfile) as f:
+            job = json.load(f)
+        code = update.main(job["args"])
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def finish_job(jobfile, status):
+    base = jobfile[: -len(".running")]
+    if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+        os.rename(jobfile, base + ".done")
+    else:
+        os.rename(jobfile, base + ".failed")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    warm_up(args.preload)
+
+    # pid -> job file
+    running = {}
+    while True:
+        while running:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if not pid:
+                break
+            finish_job(running.pop(pid), status)
+
+        jobs = claim_jobs(args.jobdir)
+        while len(running) < args.max_jobs:
+            jobfile = next(jobs, None)
+            if jobfile is None:
+                break
+            running[start_job(jobfile)] = jobfile
+
+        if args.once and not running:
+            return 0
+        time.sleep(args.poll)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
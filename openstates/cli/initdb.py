@@ -1,4 +1,4 @@
-from ..metadata import STATES_BY_ABBR
+from .. import metadata
 from ..utils.django import init_django
 from django.db import transaction
 
@@ -79,9 +79,9 @@ def create_full_jurisdiction(state):
 
 
 def load_jurisdictions():
-    for name, state in STATES_BY_ABBR.items():
-        print("loading", name)
-        create_full_jurisdiction(state)
+    for abbr in metadata.data.ABBRS:
+        print("loading", abbr)
+        create_full_jurisdiction(metadata.lookup(abbr=abbr))
 
 
 def main():
@@ -0,0 +1,43 @@
+import json
+import sys
+import textwrap
+from openstates.cli.daemon import main
+from .test_update_many import JURISDICTION_MODULE
+
+
+def test_daemon_runs_jobs(tmpdir):
+    tmpdir.join("example_jurisdiction.py").write(textwrap.dedent(JURISDICTION_MODULE))
+    jobdir = tmpdir.mkdir("jobs")
+    datadir = str(tmpdir.join("data"))
+    jobdir.join("good.json").write(
+        json.dumps({"args": ["example_jurisdiction", "--scrape", "--datadir", datadir]})
+    )
+    jobdir.join("bad.json").write(json.dumps({"args": ["no_such_jurisdiction"]}))
+
+    sys.path.insert(0, str(tmpdir))
+    try:
+        result = main(
+            [
+                "--jobdir",
+                str(jobdir),
+                "--once",
+                "--poll",
+                "0.1",
+                "--max-jobs",
+                "2",
+                "--preload",
+                "example_jurisdiction",
+            ]
+        )
+    finally:
+        sys.path.remove(str(tmpdir))
+
+    assert result == 0
+    assert sorted(f.basename for f in jobdir.listdir()) == [
+        "bad.failed",
+        "bad.log",
+        "good.done",
+        "good.log",
+    ]
+    assert "people scrape" in jobdir.join("good.log").read()
+    assert "ModuleNotFoundError" in jobdir.join("bad.log").read()
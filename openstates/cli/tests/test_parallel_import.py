@@ -0,0 +1,195 @@
+import json
+import os
+import datetime
+import pytest
+from openstates.data.models import (
+    Jurisdiction,
+    Division,
+    Organization,
+    Bill,
+    VoteEvent,
+    RelatedBill,
+)
+from openstates.scrape import Bill as ScrapeBill, VoteEvent as ScrapeVoteEvent
+from openstates.importers.base import json_at
+from openstates.cli.update import (
+    partition_by_session,
+    import_session,
+    merge_import_reports,
+    do_parallel_import,
+)
+from openstates import settings
+
+
+class FakeJurisdiction:
+    jurisdiction_id = "jid"
+
+
+def create_jurisdiction():
+    Division.objects.create(id="ocd-division/country:us", name="USA")
+    j = Jurisdiction.objects.create(id="jid", division_id="ocd-division/country:us")
+    j.legislative_sessions.create(identifier="1899", name="1899")
+    j.legislative_sessions.create(identifier="1900", name="1900")
+    Organization.objects.create(name="House", classification="lower", jurisdiction=j)
+
+
+def write_objects(datadir, objects, output_format="json"):
+    if output_format == "jsonl":
+        for obj in objects:
+            with open(os.path.join(datadir, obj._type + ".jsonl"), "a") as f:
+                f.write(json.dumps(obj.as_dict()) + "\n")
+        return
+    for obj in objects:
+        fname = "{}_{}.json".format(obj._type, obj._id)
+        with open(os.path.join(datadir, fname), "w") as f:
+            json.dump(obj.as_dict(), f)
+
+
+def write_data(datadir, output_format="json"):
+    objects = []
+    for session in ("1899", "1900"):
+        for n in range(3):
+            bill = ScrapeBill(f"HB {n}", session, "A Bill", chamber="lower")
+            bill.add_action("introduced", "1900-01-01", chamber="lower")
+            objects.append(bill)
+        vote = ScrapeVoteEvent(
+            legislative_session=session,
+            motion_text="passage",
+            start_date="1900-04-01",
+            classification="passage:bill",
+            result="pass",
+            bill_chamber="lower",
+            bill="HB 1",
+            chamber="lower",
+        )
+        objects.append(vote)
+    # a 1900 bill that relates to a bill in the 1899 session
+    objects[4].add_related_bill(
+        "HB 1", legislative_session="1899", relation_type="prior-session"
+    )
+    write_objects(datadir, objects, output_format)
+
+
+@pytest.mark.parametrize("output_format", ["json", "jsonl"])
+def test_partition_by_session(tmpdir, output_format):
+    write_data(str(tmpdir), output_format)
+    partitions = partition_by_session(str(tmpdir))
+    assert set(partitions) == {"1899", "1900"}
+    for session, items in partitions.items():
+        assert len(items["bill"]) == 3
+        assert len(items["vote_event"]) == 1
+        # only the locations are kept, the objects are decoded again by the worker
+        bills = list(json_at(items["bill"]))
+        assert {b["legislative_session"] for b in bills} == {session}
+        assert sorted(b["identifier"] for b in bills) == ["HB 0", "HB 1", "HB 2"]
+        (vote,) = json_at(items["vote_event"])
+        assert vote["legislative_session"] == session
+
+
+def test_merge_import_reports():
+    early = datetime.datetime(2020, 1, 1)
+    late = datetime.datetime(2020, 1, 2)
+
+    def _record(insert, noop, start, end):
+        return {
+            "insert": insert,
+            "update": 0,
+            "noop": noop,
+            "start": start,
+            "end": end,
+            "records": {
+                "insert": ["i"] * insert,
+                "update": [],
+                "noop": ["n"] * noop,
+            },
+        }
+
+    merged = merge_import_reports(
+        [
+            {"bill": _record(2, 1, early, early)},
+            {
+                "bill": _record(1, 0, late, late),
+                "vote_event": _record(1, 0, late, late),
+            },
+        ]
+    )
+    assert merged["bill"]["insert"] == 3
+    assert merged["bill"]["noop"] == 1
+    assert merged["bill"]["records"]["insert"] == ["i", "i", "i"]
+    assert merged["bill"]["start"] == early
+    assert merged["bill"]["end"] == late
+    assert merged["vote_event"]["insert"] == 1
+
+
+@pytest.mark.django_db
+def test_import_session(tmpdir):
+    create_jurisdiction()
+    write_data(str(tmpdir))
+    partitions = partition_by_session(str(tmpdir))
+
+    results = [import_session("jid", items) for items in partitions.values()]
+    report = merge_import_reports(r for r, _ in results)
+    assert report["bill"]["insert"] == 6
+    assert report["vote_event"]["insert"] == 2
+    assert Bill.objects.count() == 6
+    assert VoteEvent.objects.filter(bill__isnull=False).count() == 2
+    sessions = set()
+    for _, seen in results:
+        sessions.update(seen)
+    assert len(sessions) == 2
+    # related bills are left for the parent process to resolve
+    assert RelatedBill.objects.get().related_bill is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_do_parallel_import(tmpdir):
+    create_jurisdiction()
+    write_data(str(tmpdir))
+
+    settings.IMPORT_WORKERS = 2
+    try:
+        report, sessions = do_parallel_import(FakeJurisdiction(), str(tmpdir))
+    finally:
+        settings.IMPORT_WORKERS = 1
+
+    assert report["bill"]["insert"] == 6
+    assert report["vote_event"]["insert"] == 2
+    assert len(sessions) == 2
+    assert Bill.objects.count() == 6
+    assert RelatedBill.objects.get().related_bill.legislative_session.identifier == (
+        "1899"
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_do_parallel_import_cross_session_vote(tmpdir):
+    create_jurisdiction()
+    bill = ScrapeBill("HB 1", "1899", "A Bill", chamber="lower")
+    other = ScrapeBill("HB 2", "1900", "Another Bill", chamber="lower")
+    # a vote in one session on a bill (referred to by _id) from another
+    vote = ScrapeVoteEvent(
+        legislative_session="1900",
+        motion_text="passage",
+        start_date="1900-04-01",
+        classification="passage:bill",
+        result="pass",
+        bill=bill,
+        chamber="lower",
+    )
+    write_objects(str(tmpdir), [bill, other, vote])
+
+    partitions = partition_by_session(str(tmpdir))
+    assert len(partitions["1899"]["vote_event"]) == 1
+    assert partitions["1900"]["vote_event"] == []
+
+    settings.IMPORT_WORKERS = 2
+    try:
+        report, sessions = do_parallel_import(FakeJurisdiction(), str(tmpdir))
+    finally:
+        settings.IMPORT_WORKERS = 1
+
+    assert report["vote_event"]["insert"] == 1
+    vote_event = VoteEvent.objects.get()
+    assert vote_event.bill.identifier == "HB 1"
+    assert vote_event.legislative_session.identifier == "1900"
+    assert len(sessions) == 2
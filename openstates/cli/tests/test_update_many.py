@@ -0,0 +1,70 @@
+import os
+import sys
+import textwrap
+from openstates.cli.update_many import main
+
+JURISDICTION_MODULE = """
+from openstates.scrape import Jurisdiction, Organization, Person, Scraper
+
+
+class PersonScraper(Scraper):
+    def scrape(self):
+        p = Person("Jane Doe")
+        p.add_source("http://example.com")
+        yield p
+
+
+class Example(Jurisdiction):
+    division_id = "ocd-division/country:us/state:ex"
+    classification = "government"
+    name = "Example"
+    url = "http://example.com"
+    legislative_sessions = [
+        {
+            "identifier": "2021",
+            "name": "2021",
+            "start_date": "2021-01-01",
+            "end_date": "2021-12-31",
+        }
+    ]
+    scrapers = {"people": PersonScraper}
+
+    def get_session_list(self):
+        return ["2021"]
+
+    def get_organizations(self):
+        yield Organization("Legislature", classification="legislature")
+"""
+
+
+def test_update_many(tmpdir, capsys):
+    tmpdir.join("example_jurisdiction.py").write(textwrap.dedent(JURISDICTION_MODULE))
+    sys.path.insert(0, str(tmpdir))
+    logdir = str(tmpdir.join("logs"))
+    try:
+        result = main(
+            [
+                "example_jurisdiction",
+                "no_such_jurisdiction",
+                "--scrape",
+                "--logdir",
+                logdir,
+                "--datadir",
+                str(tmpdir.join("data")),
+                "--concurrency",
+                "2",
+            ]
+        )
+    finally:
+        sys.path.remove(str(tmpdir))
+
+    assert result == 1
+    out = capsys.readouterr().out
+    assert "example_jurisdiction: ok" in out
+    assert "no_such_jurisdiction: FAILED" in out
+    assert "1 succeeded, 1 failed" in out
+
+    with open(os.path.join(logdir, "example_jurisdiction.log")) as f:
+        assert "people scrape" in f.read()
+    with open(os.path.join(logdir, "no_such_jurisdiction.log")) as f:
+        assert "ModuleNotFoundError" in f.read()
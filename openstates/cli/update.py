@@ -1,15 +1,17 @@
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 import argparse
 import contextlib
 import glob
 import importlib
 import logging
 import logging.config
+import multiprocessing
 import os
 import sys
 import traceback
 
-from django.db import transaction
+from django.db import connections, transaction
 
 from ..exceptions import CommandError
 from ..scrape import Jurisdiction, JurisdictionScraper
@@ -36,12 +38,14 @@ def override_settings(settings, overrides):
     for key, value in overrides.items():
         original[key] = getattr(settings, key, UNSET)
         setattr(settings, key, value)
-    yield
-    for key, value in original.items():
-        if value is UNSET:
-            delattr(settings, key)
-        else:
-            setattr(settings, key, value)
+    try:
+        yield
+    finally:
+        for key, value in original.items():
+            if value is UNSET:
+                delattr(settings, key)
+            else:
+                setattr(settings, key, value)
 
 
 def get_jurisdiction(module_name):
@@ -70,8 +74,9 @@ def do_scrape(juris, args, scrapers):
     datadir = os.path.join(settings.SCRAPED_DATA_DIR, args.module)
     utils.makedirs(datadir)
     # clear json from data dir
-    for f in glob.glob(datadir + "/*.json"):
-        os.remove(f)
+    for pattern in ("*.json", "*.jsonl", "*.jsonl.gz"):
+        for f in glob.glob(os.path.join(datadir, pattern)):
+            os.remove(f)
 
     report = {}
 
@@ -98,17 +103,27 @@ def do_import(juris, args):
         BillImporter,
         VoteEventImporter,
     )
+    from openstates.importers.base import JurisdictionCache
 
     datadir = os.path.join(settings.SCRAPED_DATA_DIR, args.module)
 
+    if settings.IMPORT_WORKERS > 1:
+        report, seen_sessions = do_parallel_import(juris, datadir)
+        for session in seen_sessions:
+            generate_session_report(session)
+        return report
+
     juris_importer = JurisdictionImporter(juris.jurisdiction_id)
-    bill_importer = BillImporter(juris.jurisdiction_id)
-    vote_event_importer = VoteEventImporter(juris.jurisdiction_id, bill_importer)
+    cache = JurisdictionCache(juris.jurisdiction_id)
+    bill_importer = BillImporter(juris.jurisdiction_id, cache)
+    vote_event_importer = VoteEventImporter(juris.jurisdiction_id, bill_importer, cache)
     report = {}
 
     with transaction.atomic():
         print("import jurisdictions...")
         report.update(juris_importer.import_directory(datadir))
+        # the jurisdiction import can add sessions
+        cache.load()
         if settings.ENABLE_BILLS:
             print("import bills...")
             report.update(bill_importer.import_directory(datadir))
@@ -126,6 +141,170 @@ def do_import(juris, args):
     return report
 
 
+def partition_by_session(datadir):
+    """
+    split bills & vote events into {legislative_session: {type: [locations]}}
+
+    objects are only decoded here to find their session, each worker decodes its own
+    session's objects from their locations (see json_at) instead of having them sent
+    to it
+
+    vote events that refer to a scraped bill by its _id are imported with that bill,
+    which may be in a different session
+    """
+    from openstates.importers.base import json_stream
+
+    partitions = defaultdict(lambda: {"bill": [], "vote_event": []})
+    bill_sessions = {}
+    if settings.ENABLE_BILLS:
+        for location, data in json_stream(datadir, "bill", locations=True):
+            bill_sessions[data["_id"]] = data["legislative_session"]
+            partitions[data["legislative_session"]]["bill"].append(location)
+    if settings.ENABLE_VOTES:
+        for location, data in json_stream(datadir, "vote_event", locations=True):
+            session = bill_sessions.get(data.get("bill"), data["legislative_session"])
+            partitions[session]["vote_event"].append(location)
+    return dict(partitions)
+
+
+def load_import_cache(jurisdiction_id):
+    """
+    load the sessions, pseudo id indexes & vote event pupa_ids that every import
+    worker would need
+    """
+    from openstates.data.models import VoteEvent
+    from openstates.importers import OrganizationImporter, PersonImporter
+    from openstates.importers.base import JurisdictionCache
+
+    cache = JurisdictionCache(jurisdiction_id)
+    cache.load()
+    if settings.IMPORT_PRELOAD_PSEUDO_IDS:
+        OrganizationImporter(jurisdiction_id, cache).get_pseudo_id_index()
+        PersonImporter(jurisdiction_id, cache).get_pseudo_id_index()
+    if settings.ENABLE_VOTES:
+        cache.get_pupa_ids(VoteEvent)
+    return cache
+
+
+def import_session(jurisdiction_id, items, cache=None):
+    """
+    import one session's bills & vote events (locations from partition_by_session) in
+    their own transaction
+
+    returns the import report along with the ids of the sessions that were touched
+    """
+    from openstates.importers import BillImporter, VoteEventImporter
+    from openstates.importers.base import json_at
+
+    bill_importer = BillImporter(jurisdiction_id, cache)
+    vote_event_importer = VoteEventImporter(jurisdiction_id, bill_importer, cache)
+    report = {}
+
+    with transaction.atomic():
+        if items["bill"]:
+            # related bills can point to other sessions, they're resolved at the end
+            report.update(
+                bill_importer.import_data(json_at(items["bill"]), postimport=False)
+            )
+        if items["vote_event"]:
+            report.update(vote_event_importer.import_data(json_at(items["vote_event"])))
+
+    seen_sessions = set(bill_importer.get_seen_sessions())
+    seen_sessions.update(vote_event_importer.get_seen_sessions())
+    return report, seen_sessions
+
+
+# the cache loaded by do_parallel_import, inherited by its forked workers
+_worker_cache = None
+
+
+def _init_import_worker(cache):
+    global _worker_cache
+    _worker_cache = cache
+
+
+def _import_session_in_worker(jurisdiction_id, items):
+    return import_session(jurisdiction_id, items, _worker_cache)
+
+
+def merge_import_reports(reports):
+    """ combine import reports ({type: record}) from several importers of each type """
+    merged = {}
+    for report in reports:
+        for _type, record in report.items():
+            if _type not in merged:
+                merged[_type] = {
+                    "insert": 0,
+                    "update": 0,
+                    "noop": 0,
+                    "start": record["start"],
+                    "end": record["end"],
+                    "records": {"insert": [], "update": [], "noop": []},
+                }
+            total = merged[_type]
+            for what in ("insert", "update", "noop"):
+                total[what] += record[what]
+                total["records"][what].extend(record["records"][what])
+            total["start"] = min(total["start"], record["start"])
+            total["end"] = max(total["end"], record["end"])
+    return merged
+
+
+def do_parallel_import(juris, datadir):
+    """
+    import bills & vote events with a process per legislative session
+
+    each session is imported in its own transaction, so a failure in one session
+    doesn't roll back sessions that have already been imported
+    """
+    from openstates.importers import JurisdictionImporter, BillImporter
+
+    report = {}
+    with transaction.atomic():
+        print("import jurisdictions...")
+        report.update(
+            JurisdictionImporter(juris.jurisdiction_id).import_directory(datadir)
+        )
+
+    partitions = partition_by_session(datadir)
+    # loaded once here rather than by each worker
+    cache = load_import_cache(juris.jurisdiction_id)
+    print(
+        "import {} sessions with {} workers...".format(
+            len(partitions), settings.IMPORT_WORKERS
+        )
+    )
+
+    # each worker needs its own database connection, don't share the parent's
+    connections.close_all()
+    # workers are forked with the cache, rather than having it pickled with each session
+    with ProcessPoolExecutor(
+        max_workers=settings.IMPORT_WORKERS,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_init_import_worker,
+        initargs=(cache,),
+    ) as pool:
+        results = list(
+            pool.map(
+                _import_session_in_worker,
+                [juris.jurisdiction_id] * len(partitions),
+                partitions.values(),
+            )
+        )
+
+    seen_sessions = set()
+    for _, sessions in results:
+        seen_sessions.update(sessions)
+    report.update(merge_import_reports(r for r, _ in results))
+
+    # now that every session is in, resolve related bills across sessions
+    if settings.ENABLE_BILLS:
+        with transaction.atomic():
+            BillImporter(juris.jurisdiction_id).resolve_related_bills(seen_sessions)
+
+    return report, seen_sessions
+
+
 def check_session_list(juris):
     scraper = type(juris).__name__
 
@@ -221,7 +400,7 @@ def do_update(args, other, juris):
     return report
 
 
-def parse_args():
+def parse_args(argv=None):
     parser = argparse.ArgumentParser("openstates", description="openstates CLI")
     parser.add_argument("--debug", action="store_true", help="open debugger on error")
     parser.add_argument(
@@ -235,6 +414,14 @@ def parse_args():
     )
     # what to scrape
     parser.add_argument("module", type=str, help="path to scraper module")
+    add_update_arguments(parser)
+
+    # process args
+    return parser.parse_known_args(argv)
+
+
+def add_update_arguments(parser):
+    """ add the options shared by os-update & os-update-many """
     for arg in ALL_ACTIONS:
         parser.add_argument(
             "--" + arg,
@@ -279,13 +466,46 @@ def parse_args():
         type=int,
         dest="SCRAPELIB_RETRY_WAIT_SECONDS",
     )
+    parser.add_argument(
+        "--output-format",
+        help="write scraped objects as json (a file per object), jsonl or jsonl.gz",
+        choices=("json", "jsonl", "jsonl.gz"),
+        dest="SCRAPE_OUTPUT_FORMAT",
+    )
+    parser.add_argument(
+        "--writer-thread",
+        help="write & validate scraped objects on a background thread",
+        action="store_true",
+        default=None,
+        dest="SCRAPE_WRITER_THREAD",
+    )
+    parser.add_argument(
+        "--import-workers",
+        help="import legislative sessions in parallel with this many processes",
+        type=int,
+        dest="IMPORT_WORKERS",
+    )
+    parser.add_argument(
+        "--force-import",
+        help="compare every object, even if its data hasn't changed since the last import",
+        action="store_false",
+        default=None,
+        dest="IMPORT_SKIP_UNCHANGED",
+    )
 
-    # process args
-    return parser.parse_known_args()
+
+def get_overrides(module, args):
+    """ settings from a scraper module, overridden by those from the command line """
+    overrides = {}
+    overrides.update(getattr(module, "settings", {}))
+    overrides.update(
+        {key: value for key, value in vars(args).items() if value is not None}
+    )
+    return overrides
 
 
-def main():
-    args, other = parse_args()
+def main(argv=None):
+    args, other = parse_args(argv)
 
     # set log level from command line
     handler_level = getattr(logging, args.loglevel.upper(), "INFO")
@@ -309,12 +529,7 @@ def main():
         sys.excepthook = _tb_info
 
     juris, module = get_jurisdiction(args.module)
-    overrides = {}
-    overrides.update(getattr(module, "settings", {}))
-    overrides.update(
-        {key: value for key, value in vars(args).items() if value is not None}
-    )
-    with override_settings(settings, overrides):
+    with override_settings(settings, get_overrides(module, args)):
         report = do_update(args, other, juris)
 
     if report.get("success", False):
@@ -4,12 +4,18 @@ from .. import metadata
 from ..utils.django import init_django
 
 
-def update_bill_fields_for_state(abbr):
+def update_bill_fields_for_state(abbr, *, bulk=False):
     from ..data.models import Bill
-    from ..importers.computed_fields import update_bill_fields
+    from ..importers.computed_fields import update_bill_fields, bulk_update_bill_fields
 
     state = metadata.lookup(abbr=abbr)
 
+    if bulk:
+        with transaction.atomic():
+            updated = bulk_update_bill_fields(state.jurisdiction_id)
+        click.echo(f"updated {updated} {abbr} bills")
+        return
+
     with transaction.atomic():
         bills = Bill.objects.filter(
             legislative_session__jurisdiction=state.jurisdiction_id
@@ -22,10 +28,13 @@ def update_bill_fields_for_state(abbr):
 
 @click.command()
 @click.argument("abbrs", nargs=-1)
-def main(abbrs):
+@click.option(
+    "--bulk", is_flag=True, help="update each state's bills with a single query"
+)
+def main(abbrs, bulk):
     """ updates computed fields """
     init_django()
     if not abbrs:
-        abbrs = metadata.STATES_BY_ABBR.keys()
+        abbrs = metadata.data.ABBRS
     for abbr in abbrs:
-        update_bill_fields_for_state(abbr)
+        update_bill_fields_for_state(abbr, bulk=bulk)
@@ -0,0 +1,163 @@
+"""
+run os-update for many jurisdictions, several at a time
+
+    os-update-many nc va wa --concurrency 4 --logdir logs
+
+Django is set up once and each jurisdiction runs in a process forked from this one,
+logging to {logdir}/{module}.log.
+"""
+import argparse
+import contextlib
+import copy
+import logging.config
+import multiprocessing
+import os
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+
+from ..utils.django import init_django
+from .. import utils, settings
+from .update import (
+    add_update_arguments,
+    do_update,
+    get_jurisdiction,
+    get_overrides,
+    override_settings,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        "os-update-many", description="run os-update for many jurisdictions"
+    )
+    parser.add_argument("modules", nargs="+", help="paths to scraper modules")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="number of jurisdictions to run at once (default is 4)",
+    )
+    parser.add_argument(
+        "--logdir", default="logs", help="directory for per-jurisdiction logs"
+    )
+    parser.add_argument(
+        "--loglevel",
+        default="INFO",
+        help=(
+            "set log level. options are: "
+            "DEBUG|INFO|WARNING|ERROR|CRITICAL "
+            "(default is INFO)"
+        ),
+    )
+    add_update_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def configure_logging(level):
+    """ send all logging to (the current) sys.stdout """
+    config = copy.deepcopy(settings.LOGGING)
+    config["handlers"]["default"] = {
+        "level": level,
+        "class": "logging.StreamHandler",
+        "stream": "ext://sys.stdout",
+        "formatter": "standard",
+    }
+    logging.config.dictConfig(config)
+
+
+def run_jurisdiction(module_name, args, logfile):
+    """ run os-update for a single module, returning a summary of the run """
+    args = copy.copy(args)
+    args.module = module_name
+    summary = {"module": module_name, "success": False, "start": utils.utcnow()}
+
+    with open(logfile, "w") as log, contextlib.redirect_stdout(log):
+        configure_logging(args.loglevel.upper())
+        try:
+            juris, module = get_jurisdiction(module_name)
+            with override_settings(settings, get_overrides(module, args)):
+                report = do_update(args, [], juris)
+            summary["success"] = report.get("success", False)
+            summary["import"] = {
+                _type: (changes["insert"], changes["update"], changes["noop"])
+                for _type, changes in report.get("import", {}).items()
+            }
+        except Exception as exc:
+            summary["exception"] = repr(exc)
+            traceback.print_exc(file=log)
+        finally:
+            # don't leave connections around for the next jurisdiction
+            connections.close_all()
+
+    summary["end"] = utils.utcnow()
+    return summary
+
+
+def print_summary(summaries):
+    for summary in summaries:
+        if summary["success"]:
+            status = "ok"
+        else:
+            status = "FAILED"
+        if "end" in summary:
+            status += " in {}".format(summary["end"] - summary["start"])
+        print("{}: {}".format(summary["module"], status))
+        if "exception" in summary:
+            print("  {}".format(summary["exception"]))
+        for _type, (insert, update, noop) in sorted(summary.get("import", {}).items()):
+            if insert or update or noop:
+                print(
+                    "  {}: {} new {} updated {} noop".format(
+                        _type, insert, update, noop
+                    )
+                )
+    failed = sum(1 for summary in summaries if not summary["success"])
+    print("{} succeeded, {} failed".format(len(summaries) - failed, failed))
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    utils.makedirs(args.logdir)
+
+    if not args.actions or "import" in args.actions:
+        init_django()
+        # each process needs its own database connection, don't share ours
+        connections.close_all()
+
+    with ProcessPoolExecutor(
+        max_workers=args.concurrency, mp_context=multiprocessing.get_context("fork")
+    ) as pool:
+        futures = [
+            (
+                module_name,
+                pool.submit(
+                    run_jurisdiction,
+                    module_name,
+                    args,
+                    os.path.join(args.logdir, module_name + ".log"),
+                ),
+            )
+            for module_name in args.modules
+        ]
+        summaries = []
+        for module_name, future in futures:
+            try:
+                summaries.append(future.result())
+            except Exception as exc:
+                # the process running the jurisdiction died
+                summaries.append(
+                    {"module": module_name, "success": False, "exception": repr(exc)}
+                )
+
+    print_summary(summaries)
+    if all(summary["success"] for summary in summaries):
+        return 0
+    else:
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
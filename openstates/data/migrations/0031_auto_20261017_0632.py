@@ -0,0 +1,73 @@
+# Generated by Django 3.2.25 on 2026-10-17 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data", "0030_auto_20210210_1817"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bill",
+            name="import_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A digest of the data this object was last imported from.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="import_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A digest of the data this object was last imported from.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="jurisdiction",
+            name="import_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A digest of the data this object was last imported from.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="organization",
+            name="import_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A digest of the data this object was last imported from.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="person",
+            name="import_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A digest of the data this object was last imported from.",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="voteevent",
+            name="import_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="A digest of the data this object was last imported from.",
+                max_length=64,
+            ),
+        ),
+    ]
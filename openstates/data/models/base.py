@@ -57,6 +57,20 @@ class OCDBase(models.Model):
         abstract = True
 
 
+class ImportedBase(OCDBase):
+    """ top-level models written by the importers """
+
+    import_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="A digest of the data this object was last imported from.",
+    )
+
+    class Meta:
+        abstract = True
+
+
 class RelatedBase(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
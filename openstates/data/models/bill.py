@@ -5,7 +5,7 @@ from django.contrib.postgres.indexes import GinIndex
 
 
 from .base import (
-    OCDBase,
+    ImportedBase,
     LinkBase,
     OCDIDField,
     RelatedBase,
@@ -17,7 +17,7 @@ from .jurisdiction import LegislativeSession
 from .. import common
 
 
-class Bill(OCDBase):
+class Bill(ImportedBase):
     id = OCDIDField(ocd_type="bill")
     legislative_session = models.ForeignKey(
         LegislativeSession,
@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField, JSONField
 from .base import (
-    OCDBase,
+    ImportedBase,
     LinkBase,
     OCDIDField,
     RelatedBase,
@@ -47,7 +47,7 @@ class EventLocation(RelatedBase):
         db_table = "opencivicdata_eventlocation"
 
 
-class Event(OCDBase):
+class Event(ImportedBase):
     id = OCDIDField(ocd_type="event")
     name = models.CharField(max_length=1000)
     jurisdiction = models.ForeignKey(
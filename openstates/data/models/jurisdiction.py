@@ -1,10 +1,10 @@
 from django.db import models
 from ..common import JURISDICTION_CLASSIFICATION_CHOICES, SESSION_CLASSIFICATION_CHOICES
-from .base import OCDBase, OCDIDField, RelatedBase
+from .base import ImportedBase, OCDIDField, RelatedBase
 from .division import Division
 
 
-class Jurisdiction(OCDBase):
+class Jurisdiction(ImportedBase):
     """
     A Jurisdiction represents a logical unit of governance.
 
@@ -2,7 +2,14 @@ import datetime
 from django.db import models
 from django.db.models import Q, QuerySet
 from django.contrib.postgres.fields import JSONField
-from .base import OCDBase, LinkBase, OCDIDField, RelatedBase, IdentifierBase
+from .base import (
+    OCDBase,
+    ImportedBase,
+    LinkBase,
+    OCDIDField,
+    RelatedBase,
+    IdentifierBase,
+)
 from .division import Division
 from .jurisdiction import Jurisdiction
 from .. import common
@@ -12,7 +19,7 @@ from ...utils import abbr_to_jid
 # the actual models
 
 
-class Organization(OCDBase):
+class Organization(ImportedBase):
     """
     A group of people, typically in a legislative or rule-making context.
     """
@@ -190,7 +197,7 @@ class PersonQuerySet(QuerySet):
         return people
 
 
-class Person(OCDBase):
+class Person(ImportedBase):
     """
     An individual that has served in a political office.
     """
@@ -1,14 +1,14 @@
 from django.db import models
 from django.contrib.postgres.fields import ArrayField, JSONField
 
-from .base import OCDBase, LinkBase, OCDIDField, RelatedBase
+from .base import ImportedBase, LinkBase, OCDIDField, RelatedBase
 from .people_orgs import Organization, Person
 from .jurisdiction import LegislativeSession
 from .bill import Bill, BillAction
 from .. import common
 
 
-class VoteEvent(OCDBase):
+class VoteEvent(ImportedBase):
     id = OCDIDField(ocd_type="vote")
     identifier = models.CharField(max_length=300, blank=True)
     motion_text = models.TextField()
@@ -1,8 +1,17 @@
 import os
-import copy
+import uuid
 import glob
+import gzip
 import json
+import queue
+import hashlib
 import logging
+import itertools
+import threading
+import collections
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.db import models
 from django.db.models import Q
 from django.db.models.signals import post_save
 from django.contrib.contenttypes.models import ContentType
@@ -10,7 +19,16 @@ from .. import settings
 from ..data.models import LegislativeSession
 from ..exceptions import DuplicateItemError, UnresolvedIdError, DataImportError
 from ..reports.models import Identifier
-from ..utils import get_pseudo_id, utcnow
+from .bulk import copy_insert
+from ..utils import get_pseudo_id, utcnow, JSONEncoderPlus
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# number of lines of a .jsonl file decoded together
+JSONL_CHUNK_SIZE = 100
 
 
 def omnihash(obj):
@@ -25,21 +43,275 @@ def omnihash(obj):
         return hash(obj)
 
 
-def _match(dbitem, jsonitem, keys, subfield_dict):
-    # check if all keys (excluding subfields) match
-    for k in keys:
-        if k not in subfield_dict and getattr(dbitem, k) != jsonitem.get(k, None):
-            return False
+class _ContentHashEncoder(JSONEncoderPlus):
+    def default(self, obj, **kwargs):
+        # prepared data can contain resolved ids & model instances (e.g. event location)
+        if isinstance(obj, uuid.UUID):
+            return str(obj)
+        if isinstance(obj, models.Model):
+            return obj.pk
+        return super(_ContentHashEncoder, self).default(obj, **kwargs)
+
+
+def content_hash(obj):
+    """
+    stable digest of a JSON-like object
+
+    unlike omnihash this doesn't depend on the process (hash randomization), so it can
+    be stored and compared against on later imports
+    """
+    serialized = json.dumps(
+        obj, cls=_ContentHashEncoder, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(serialized.encode("utf8")).hexdigest()
+
+
+def _loads(data):
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json_file(fname):
+    with open(fname, "rb") as f:
+        return _loads(f.read())
+
+
+def _open_jsonl(fname):
+    opener = gzip.open if fname.endswith(".gz") else open
+    return opener(fname, "rb")
+
+
+def _load_json_files(fnames):
+    return [((fname, None), load_json_file(fname)) for fname in fnames]
+
+
+def _decode_lines(task):
+    fname, start, lines = task
+    return [
+        ((fname, start + n), _loads(line))
+        for n, line in enumerate(lines)
+        if line.strip()
+    ]
+
+
+def _decode_tasks(filenames):
+    """
+    split files into (function, argument) pairs that each decode a list of objects
+
+    .json files hold a single object, .jsonl(.gz) files are split into chunks of lines
+
+    the objects are decoded along with their location, a (filename, line number) pair
+    where the line number is None for .json files
+    """
+    for fname in filenames:
+        if fname.endswith(".json"):
+            yield _load_json_files, [fname]
+        else:
+            with _open_jsonl(fname) as f:
+                for n, lines in enumerate(chunks(f, JSONL_CHUNK_SIZE)):
+                    yield _decode_lines, (fname, n * JSONL_CHUNK_SIZE, lines)
+
+
+class _DecodeError:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def _decode_in_background(filenames, workers, ordered):
+    """
+    decode files in a thread pool, yielding the results through a bounded queue
+
+    only a few chunks per worker are decoded ahead of the consumer, so memory use
+    stays flat while decoding overlaps with whatever the consumer is doing
+    """
+    lookahead = workers * 4
+    results = queue.Queue(maxsize=lookahead)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item):
+        # give up if the consumer has gone away
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                pending = collections.deque()
+                for func, arg in _decode_tasks(filenames):
+                    pending.append(pool.submit(func, arg))
+                    if len(pending) >= lookahead:
+                        put(_next_result(pending, ordered))
+                    if stop.is_set():
+                        return
+                while pending and not stop.is_set():
+                    put(_next_result(pending, ordered))
+        except BaseException as e:
+            put(_DecodeError(e))
+        put(finished)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = results.get()
+            if item is finished:
+                break
+            elif isinstance(item, _DecodeError):
+                raise item.exc
+            yield from item
+    finally:
+        stop.set()
+
+
+def _next_result(pending, ordered):
+    if ordered:
+        return pending.popleft().result()
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    future = done.pop()
+    pending.remove(future)
+    return future.result()
+
+
+def json_stream(datadir, _type, *, ordered=True, locations=False):
+    """
+    load all of the JSON objects of a given type from a directory
+
+    reads both one-object-per-file output ({type}_{id}.json) and JSON Lines output
+    ({type}.jsonl, optionally gzipped)
+
+    ordered:    yield objects in filename order (otherwise in the order they're decoded)
+    locations:  yield (location, object) pairs, locations can be read with json_at
+    """
+    filenames = glob.glob(os.path.join(datadir, _type + "_*.json"))
+    if ordered:
+        filenames.sort()
+    for ext in (".jsonl", ".jsonl.gz"):
+        fname = os.path.join(datadir, _type + ext)
+        if os.path.exists(fname):
+            filenames.append(fname)
+
+    if settings.IMPORT_DECODE_WORKERS:
+        located = _decode_in_background(
+            filenames, settings.IMPORT_DECODE_WORKERS, ordered
+        )
+    else:
+        located = (pair for func, arg in _decode_tasks(filenames) for pair in func(arg))
+
+    if locations:
+        yield from located
+    else:
+        for _, obj in located:
+            yield obj
+
+
+def json_at(locations):
+    """
+    decode the objects at a list of locations from json_stream
+
+    locations in the same file must be in the order json_stream found them
+    """
+    for fname, group in itertools.groupby(locations, key=lambda location: location[0]):
+        lines = {line for _, line in group}
+        if lines == {None}:
+            yield load_json_file(fname)
+            continue
+        with _open_jsonl(fname) as f:
+            for n, line in enumerate(f):
+                if n in lines:
+                    yield _loads(line)
 
-    # all fields match so far, possibly equal, just check subfields now
-    for k in subfield_dict:
-        jsonsubitems = jsonitem[k]
-        dbsubitems = list(getattr(dbitem, k).all())
-        if items_differ(jsonsubitems, dbsubitems, subfield_dict[k][2]):
-            return False
 
-    # if we got here, item values match
-    return True
+def chunks(iterable, size):
+    """ split an iterable into lists of at most size items """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def related_lookups(subfield_dict, prefix=""):
+    """ prefetch_related lookups for all (nested) fields in a related_models dict """
+    for field, (_, _, subsubdict) in subfield_dict.items():
+        yield prefix + field
+        yield from related_lookups(subsubdict, prefix + field + "__")
+
+
+def related_models_in_order(subfield_dict):
+    """ the models in a related_models dict, each before the models related to it """
+    for Subtype, _, subsubdict in subfield_dict.values():
+        yield Subtype
+        yield from related_models_in_order(subsubdict)
+
+
+def _freeze(value):
+    """ convert a (possibly nested) JSON-like value into something hashable """
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    elif isinstance(value, dict):
+        return frozenset((k, _freeze(v)) for k, v in value.items())
+    elif isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def _multiset(keys):
+    return frozenset(Counter(keys).items())
+
+
+def _key_spec(jsonitems, subfield_dict):
+    """
+    determine which fields to compare
+
+    returns the keys found in any of jsonitems (excluding subfields, in the order
+    they're first seen) along with a spec for each subfield, built from the subitems
+    across all of jsonitems
+
+    items don't all have the same keys (e.g. related entities have either a person_id
+    or an organization_id), missing keys are compared as None
+    """
+    keys = {}
+    for item in jsonitems:
+        for k in item:
+            if k not in subfield_dict:
+                keys.setdefault(k)
+    keys = list(keys)
+    subspecs = {}
+    for field, (_, _, subsubdict) in subfield_dict.items():
+        subitems = [subitem for item in jsonitems for subitem in item[field]]
+        subspecs[field] = _key_spec(subitems, subsubdict)
+    return keys, subspecs
+
+
+def _json_key(jsonitem, spec):
+    keys, subspecs = spec
+    return (
+        tuple(_freeze(jsonitem.get(k, None)) for k in keys),
+        tuple(
+            _multiset(_json_key(subitem, subspec) for subitem in jsonitem[field])
+            for field, subspec in subspecs.items()
+        ),
+    )
+
+
+def _db_key(dbitem, spec):
+    keys, subspecs = spec
+    return (
+        tuple(_freeze(getattr(dbitem, k)) for k in keys),
+        tuple(
+            _multiset(
+                _db_key(subitem, subspec) for subitem in getattr(dbitem, field).all()
+            )
+            for field, subspec in subspecs.items()
+        ),
+    )
 
 
 def items_differ(jsonitems, dbitems, subfield_dict):
@@ -53,41 +325,68 @@ def items_differ(jsonitems, dbitems, subfield_dict):
         # if lengths differ, they're definitely different
         return True
 
-    original_jsonitems = jsonitems
-    jsonitems = copy.deepcopy(jsonitems)
-    keys = jsonitems[0].keys()
+    # build a hashable key for each item on both sides, then compare as multisets
+    spec = _key_spec(jsonitems, subfield_dict)
+    json_keys = [_json_key(jsonitem, spec) for jsonitem in jsonitems]
+    db_keys = []
 
-    # go over dbitems looking for matches
     for dbitem in dbitems:
+        db_key = _db_key(dbitem, spec)
         order = getattr(dbitem, "order", None)
 
-        match = None
-
         # if we have an order, we can just check one item
         if order is not None:
-            # use original so that pop calls don't affect ordering
-            if not _match(dbitem, original_jsonitems[order], keys, subfield_dict):
+            if order >= len(json_keys) or json_keys[order] != db_key:
                 # short circuit if there isn't a match in the right spot
                 return True
 
-        # need to get position of match to remove
-        for i, jsonitem in enumerate(jsonitems):
-            if _match(dbitem, jsonitem, keys, subfield_dict):
-                match = i
+        db_keys.append(db_key)
 
-        if match is not None:
-            # item exists in both, remove from jsonitems
-            jsonitems.pop(match)
-        else:
-            # exists in db but not json
-            return True
+    return Counter(json_keys) != Counter(db_keys)
 
-    # if we get here, jsonitems has to be empty because we asserted that the length was
-    # the same and we found a match for each thing in dbitems, here's a safety check just in case
-    if jsonitems:  # pragma: no cover
-        return True
 
-    return False
+class JurisdictionCache(object):
+    """
+    lookups shared by the importers of one jurisdiction
+
+    legislative sessions are loaded with one query (by load, or on first use), pseudo
+    id indexes are kept by importer type and pupa_ids by model, so nested importers &
+    import workers don't each load their own
+    """
+
+    def __init__(self, jurisdiction_id):
+        self.jurisdiction_id = jurisdiction_id
+        self.sessions = None
+        self.pseudo_id_indexes = {}
+        self.pupa_ids = {}
+
+    def load(self):
+        self.sessions = dict(
+            LegislativeSession.objects.filter(
+                jurisdiction_id=self.jurisdiction_id
+            ).values_list("identifier", "id")
+        )
+
+    def get_session_id(self, identifier):
+        if self.sessions is None:
+            self.load()
+        if identifier not in self.sessions:
+            # raises DoesNotExist if the session really isn't there
+            self.sessions[identifier] = LegislativeSession.objects.get(
+                identifier=identifier, jurisdiction_id=self.jurisdiction_id
+            ).id
+        return self.sessions[identifier]
+
+    def get_pupa_ids(self, model):
+        """ map the jurisdiction's pupa_ids for model to object ids, loaded on first use """
+        if model not in self.pupa_ids:
+            content_type = ContentType.objects.get_for_model(model)
+            self.pupa_ids[model] = dict(
+                Identifier.objects.filter(
+                    content_type=content_type, jurisdiction_id=self.jurisdiction_id
+                ).values_list("identifier", "object_id")
+            )
+        return self.pupa_ids[model]
 
 
 class BaseImporter(object):
@@ -95,10 +394,17 @@ class BaseImporter(object):
 
     Override:
         get_object(data)
+        get_object_key(data)            [optional, enables batched object lookups]
+        get_objects(keys)               [optional, required if get_object_key is used]
         limit_spec(spec)                [optional, required if pseudo_ids are used]
+        lookup_pseudo_id(spec)          [optional, resolves pseudo_ids without a query]
+        load_pseudo_id_index()          [optional, loads what lookup_pseudo_id uses]
         prepare_for_db(data)            [optional]
         postimport()                    [optional]
-        update_computed_fields(obj)     [optional]
+        update_computed_fields(obj, related)    [optional, called before obj is saved]
+
+    Related objects are created at the end of each batch (see save_batch), after which
+    updated objects are saved and post_save is sent for inserted objects.
     """
 
     _type = None
@@ -108,12 +414,23 @@ class BaseImporter(object):
     merge_related = {}
     cached_transformers = {}
 
-    def __init__(self, jurisdiction_id):
+    def __init__(self, jurisdiction_id, cache=None):
         self.jurisdiction_id = jurisdiction_id
+        self.cache = cache if cache is not None else JurisdictionCache(jurisdiction_id)
         self.json_to_db_id = {}
         self.duplicates = {}
         self.pseudo_id_cache = {}
-        self.session_cache = {}
+        self.seen_sessions = set()
+        # new Identifiers to save at the end of the batch
+        self.new_identifiers = []
+        # work left for the end of the batch: related objects to create (by model),
+        # updated objects to save (with their related data) & inserted objects
+        self.new_related = {}
+        self.updated_objects = []
+        self.inserted_objects = []
+        # objects loaded for the batch currently being imported, keyed by get_object_key
+        self.batch_keys = set()
+        self.batch_objects = {}
         self.logger = logging.getLogger("openstates")
         self.info = self.logger.info
         self.debug = self.logger.debug
@@ -126,20 +443,48 @@ class BaseImporter(object):
             self.cached_transformers = settings.IMPORT_TRANSFORMERS[self._type]
 
     def get_session_id(self, identifier):
-        if identifier not in self.session_cache:
-            self.session_cache[identifier] = LegislativeSession.objects.get(
-                identifier=identifier, jurisdiction_id=self.jurisdiction_id
-            ).id
-        return self.session_cache[identifier]
+        session_id = self.cache.get_session_id(identifier)
+        self.seen_sessions.add(session_id)
+        return session_id
 
     # no-ops to be overriden
     def prepare_for_db(self, data):
         return data
 
+    def lookup_pseudo_id(self, spec):
+        """
+        Return the set of ids matching a pseudo id spec without querying the database,
+        or None if the spec has to be resolved with a query.
+        """
+        return None
+
+    def load_pseudo_id_index(self):
+        return None
+
+    def get_pseudo_id_index(self):
+        """ load_pseudo_id_index's result, shared through the cache """
+        indexes = self.cache.pseudo_id_indexes
+        if self._type not in indexes:
+            indexes[self._type] = self.load_pseudo_id_index()
+        return indexes[self._type]
+
+    def get_object_key(self, data):
+        """
+        Return a hashable key identifying the object that data refers to.
+
+        Importers that implement this (and get_objects) have existing objects looked
+        up a batch at a time instead of calling get_object once per item.
+        """
+        return None
+
+    def get_objects(self, keys):
+        """ return a dict mapping the given keys to existing objects """
+        return {}
+
     def postimport(self):
         pass
 
-    def update_computed_fields(self, obj):
+    def update_computed_fields(self, obj, related):
         pass
 
     def resolve_json_id(self, json_id, allow_no_match=False):
@@ -163,13 +508,15 @@ class BaseImporter(object):
             # keep caches of all the pseudo-ids to avoid doing 1000s of lookups during import
             if json_id not in self.pseudo_id_cache:
                 spec = get_pseudo_id(json_id)
-                spec = self.limit_spec(spec)
+                ids = self.lookup_pseudo_id(spec)
 
-                if isinstance(spec, Q):
-                    objects = self.model_class.objects.filter(spec)
-                else:
-                    objects = self.model_class.objects.filter(**spec)
-                ids = {each.id for each in objects}
+                if ids is None:
+                    spec = self.limit_spec(spec)
+                    if isinstance(spec, Q):
+                        objects = self.model_class.objects.filter(spec)
+                    else:
+                        objects = self.model_class.objects.filter(**spec)
+                    ids = {each.id for each in objects}
                 if len(ids) == 1:
                     self.pseudo_id_cache[json_id] = ids.pop()
                     errmsg = None
@@ -203,14 +550,7 @@ class BaseImporter(object):
 
     def import_directory(self, datadir):
         """ import a JSON directory into the database """
-
-        def json_stream():
-            # load all json, mapped by json_id
-            for fname in glob.glob(os.path.join(datadir, self._type + "_*.json")):
-                with open(fname) as f:
-                    yield json.load(f)
-
-        return self.import_data(json_stream())
+        return self.import_data(json_stream(datadir, self._type))
 
     def _prepare_imports(self, dicts):
 
@@ -235,8 +575,12 @@ class BaseImporter(object):
             else:
                 self.duplicates[json_id] = seen_hashes[objhash]
 
-    def import_data(self, data_items):
-        """ import a bunch of dicts together """
+    def import_data(self, data_items, *, postimport=True):
+        """
+        import a bunch of dicts together
+
+        postimport can be disabled by callers that will run it themselves later
+        """
         # keep counts of all actions
         record = {
             "insert": 0,
@@ -246,23 +590,40 @@ class BaseImporter(object):
             "records": {"insert": [], "update": [], "noop": []},
         }
 
-        for json_id, data in self._prepare_imports(data_items):
-            obj_id, what = self.import_item(data)
-            self.json_to_db_id[json_id] = obj_id
-            record["records"][what].append(obj_id)
-            record[what] += 1
+        for batch in chunks(
+            self._prepare_imports(data_items), settings.IMPORT_BATCH_SIZE
+        ):
+            batch = [(json_id, self.prepare_item(data)) for json_id, data in batch]
+            self.preload([data for _, data in batch])
+
+            for json_id, data in batch:
+                obj_id, what = self.import_prepared_item(data)
+                self.json_to_db_id[json_id] = obj_id
+                record["records"][what].append(obj_id)
+                record[what] += 1
+
+            self.save_batch()
+
+        self.batch_keys = set()
+        self.batch_objects = {}
 
         # all objects are loaded, a perfect time to do inter-object resolution and other tasks
-        self.postimport()
+        if postimport:
+            self.postimport()
 
         record["end"] = utcnow()
 
         return {self._type: record}
 
-    def import_item(self, data):
-        """ function used by import_data """
-        what = "noop"
+    def preload(self, datas):
+        """ look up the existing objects for a batch of prepared data at once """
+        keys = {self.get_object_key(data) for data in datas}
+        keys.discard(None)
+        self.batch_keys = keys
+        self.batch_objects = self.get_objects(keys) if keys else {}
 
+    def prepare_item(self, data):
+        """ transform a single JSON dict into the form expected by the database """
         # remove the JSON _id (may still be there if called directly)
         data.pop("_id", None)
         if self._type == "vote_event":
@@ -270,12 +631,43 @@ class BaseImporter(object):
 
         # add fields/etc.
         data = self.apply_transformers(data)
-        data = self.prepare_for_db(data)
+        return self.prepare_for_db(data)
 
-        try:
-            obj = self.get_object(data)
-        except self.model_class.DoesNotExist:
-            obj = None
+    def import_item(self, data):
+        """ import a single dict, outside of import_data's batches """
+        result = self.import_prepared_item(self.prepare_item(data))
+        self.save_batch()
+        return result
+
+    def save_batch(self):
+        """ finish the work import_prepared_item left for the end of the batch """
+        self.save_related()
+
+        for obj, related in self.updated_objects:
+            self.update_computed_fields(obj, related)
+            obj.save()
+        self.updated_objects = []
+
+        # Fire post-save signal after related objects are created to allow
+        # for handlers make use of related objects
+        for obj in self.inserted_objects:
+            post_save.send(sender=self.model_class, instance=obj, created=True)
+        self.inserted_objects = []
+
+        self.save_identifiers()
+
+    def import_prepared_item(self, data):
+        what = "noop"
+        data_hash = content_hash(data)
+
+        object_key = self.get_object_key(data)
+        if object_key is not None and object_key in self.batch_keys:
+            obj = self.batch_objects.get(object_key)
+        else:
+            try:
+                obj = self.get_object(data)
+            except self.model_class.DoesNotExist:
+                obj = None
 
         # remove pupa_id which does not belong in the OCD data models
         pupa_id = data.pop("pupa_id", None)
@@ -289,46 +681,59 @@ class BaseImporter(object):
         if obj:
             if obj.id in self.json_to_db_id.values():
                 raise DuplicateItemError(data, obj, related.get("sources", []))
-            # check base object for changes
-            for key, value in data.items():
-                if getattr(obj, key) != value:
-                    setattr(obj, key, value)
-                    what = "update"
 
-            updated = self._update_related(obj, related, self.related_models)
-            if updated:
-                what = "update"
+            # data identical to the last import can't have changed anything
+            if not settings.IMPORT_SKIP_UNCHANGED or obj.import_hash != data_hash:
+                # check base object for changes
+                for key, value in data.items():
+                    if getattr(obj, key) != value:
+                        setattr(obj, key, value)
+                        what = "update"
 
-            if what == "update":
-                # make sure to do this after create related
-                self.update_computed_fields(obj)
-                obj.save()
+                updated = self._update_related(obj, related, self.related_models)
+                if updated:
+                    what = "update"
+
+                if what == "update":
+                    obj.import_hash = data_hash
+                    # saved once the related objects exist
+                    self.updated_objects.append((obj, related))
+                elif obj.import_hash != data_hash:
+                    # queryset update doesn't touch updated_at
+                    self.model_class.objects.filter(id=obj.id).update(
+                        import_hash=data_hash
+                    )
 
         # need to create the data
         else:
             what = "insert"
             try:
-                obj = self.model_class(**data)
+                obj = self.model_class(import_hash=data_hash, **data)
+                # computed from the scraped related data, which is all that's needed
+                self.update_computed_fields(obj, related)
                 obj.save()
             except Exception as e:
                 raise DataImportError(
                     "{} while importing {} as {}".format(e, data, self.model_class)
                 )
             self._create_related(obj, related, self.related_models)
+            self.inserted_objects.append(obj)
 
-            # make sure to do this after create related
-            self.update_computed_fields(obj)
-
-            # Fire post-save signal after related objects are created to allow
-            # for handlers make use of related objects
-            post_save.send(sender=self.model_class, instance=obj, created=True)
+            # later items in this batch that refer to the same object should find it
+            if object_key is not None and object_key in self.batch_keys:
+                self.batch_objects[object_key] = obj
 
         if pupa_id:
-            Identifier.objects.get_or_create(
-                identifier=pupa_id,
-                jurisdiction_id=self.jurisdiction_id,
-                defaults={"content_object": obj},
-            )
+            pupa_ids = self.cache.get_pupa_ids(self.model_class)
+            if pupa_id not in pupa_ids:
+                pupa_ids[pupa_id] = obj.id
+                self.new_identifiers.append(
+                    Identifier(
+                        identifier=pupa_id,
+                        jurisdiction_id=self.jurisdiction_id,
+                        content_object=obj,
+                    )
+                )
 
         return obj.id, what
 
@@ -388,6 +793,11 @@ class BaseImporter(object):
 
                 # import anything that made it to new_items in the usual fashion
                 self._create_related(obj, {field: new_items}, subfield_dict)
+            elif settings.IMPORT_DIFF_RELATED:
+                # only touch the rows that actually changed
+                if do_delete or do_update:
+                    updated = True
+                    self._diff_related(obj, field, items, dbitems, subfield_dict)
             else:
                 # default logic is to just wipe and recreate subobjects
                 if do_delete:
@@ -399,16 +809,128 @@ class BaseImporter(object):
 
         return updated
 
-    def _create_related(self, obj, related, subfield_dict):
+    def _diff_related(self, obj, field, items, dbitems, subfield_dict):
+        """
+        make a related collection match items, keeping unchanged DB objects
+            obj:            a base object to update related
+            field:          name of the related collection
+            items:          list of related objects from JSON
+            dbitems:        list of related objects from the database
+            subfield_dict:  where to get the next layer of subfields
+
+        items & dbitems are matched on all of their values (including subitems), and
+        matched objects in ordered collections are renumbered in place
+
+        the unmatched items replace unmatched DB objects in place, by position in
+        ordered collections (so an edited action keeps its id) and in any order
+        otherwise, the rest are deleted or created in bulk
         """
-        create DB objects related to a base object
+        Subtype, _, subsubdict = subfield_dict[field]
+        ordered = field in self.preserve_order
+        keys, subspecs = _key_spec(items, subsubdict)
+        # order is reassigned below, so it can't be used for matching
+        spec = ([k for k in keys if k != "order"], subspecs)
+
+        unmatched = defaultdict(list)
+        for dbitem in dbitems:
+            unmatched[_db_key(dbitem, spec)].append(dbitem)
+
+        new_items = []
+        changed = {}
+        for order, item in enumerate(items):
+            candidates = unmatched.get(_json_key(item, spec))
+            if not candidates:
+                if ordered:
+                    item["order"] = order
+                new_items.append(item)
+                continue
+
+            # prefer an identical object that is already in the right spot
+            dbitem = next(
+                (c for c in candidates if getattr(c, "order", None) == order),
+                candidates[0],
+            )
+            candidates.remove(dbitem)
+            if ordered and dbitem.order != order:
+                dbitem.order = order
+                changed.setdefault(dbitem, set()).add("order")
+
+        stale = [dbitem for dbitems in unmatched.values() for dbitem in dbitems]
+        if ordered:
+            stale_by_order = {dbitem.order: dbitem for dbitem in stale}
+            pairs = [
+                (item, stale_by_order[item["order"]])
+                for item in new_items
+                if item["order"] in stale_by_order
+            ]
+        else:
+            pairs = list(zip(new_items, stale))
+
+        paired_items = {id(item) for item, _ in pairs}
+        paired_dbitems = {dbitem.id for _, dbitem in pairs}
+        new_items = [item for item in new_items if id(item) not in paired_items]
+        stale = [dbitem for dbitem in stale if dbitem.id not in paired_dbitems]
+
+        for item, dbitem in pairs:
+            for key, value in item.items():
+                if key in subsubdict:
+                    continue
+                if getattr(dbitem, key) != value:
+                    setattr(dbitem, key, value)
+                    changed.setdefault(dbitem, set()).add(key)
+            for subfield in subsubdict:
+                subitems = item[subfield]
+                dbsubitems = list(getattr(dbitem, subfield).all())
+                if items_differ(subitems, dbsubitems, subsubdict[subfield][2]):
+                    self._diff_related(
+                        dbitem, subfield, subitems, dbsubitems, subsubdict
+                    )
+
+        if stale:
+            Subtype.objects.filter(id__in=[dbitem.id for dbitem in stale]).delete()
+        if changed:
+            Subtype.objects.bulk_update(
+                list(changed), sorted(set().union(*changed.values()))
+            )
+        if new_items:
+            self._create_related(
+                obj, {field: new_items}, subfield_dict, assign_order=False
+            )
+
+    def _create_related(self, obj, related, subfield_dict, assign_order=True):
+        """
+        create DB objects related to a base object (saved by save_related)
             obj:            a base object to create related
             related:        dict mapping field names to lists of related objects
             subfield_list:  where to get the next layer of subfields
+            assign_order:   number ordered items by position (otherwise already set)
         """
+        # ids are generated client-side, so every level of subobjects can be built
+        # before anything is saved, and then saved with one query per model for the
+        # whole batch
+        self._build_related(obj, related, subfield_dict, self.new_related, assign_order)
+
+    def save_related(self):
+        """ create the related objects gathered by _create_related """
+        copy_threshold = settings.IMPORT_COPY_THRESHOLD
+        # parents are created before the objects that refer to them
+        for Subtype in related_models_in_order(self.related_models):
+            objects = self.new_related.pop(Subtype, None)
+            if not objects:
+                continue
+            try:
+                if copy_threshold and len(objects) > copy_threshold:
+                    copy_insert(Subtype, objects)
+                else:
+                    Subtype.objects.bulk_create(objects)
+            except Exception as e:
+                raise DataImportError(
+                    "{} while importing {} as {}".format(e, objects, Subtype)
+                )
+
+    def _build_related(self, obj, related, subfield_dict, subobjects, assign_order):
+        """ instantiate related objects, adding them to subobjects (model: [objects]) """
         for field, items in related.items():
-            subobjects = []
-            all_subrelated = []
             Subtype, reverse_id_field, subsubdict = subfield_dict[field]
             for order, item in enumerate(items):
                 # pull off 'subrelated' (things that are related to this obj)
@@ -416,43 +938,31 @@ class BaseImporter(object):
                 for subfield in subsubdict:
                     subrelated[subfield] = item.pop(subfield)
 
-                if field in self.preserve_order:
+                if field in self.preserve_order and assign_order:
                     item["order"] = order
 
                 item[reverse_id_field] = obj.id
 
                 try:
-                    subobjects.append(Subtype(**item))
-                    all_subrelated.append(subrelated)
+                    subobj = Subtype(**item)
                 except Exception as e:
                     raise DataImportError(
                         "{} while importing {} as {}".format(e, item, Subtype)
                     )
+                subobjects.setdefault(Subtype, []).append(subobj)
 
-            # add all subobjects at once (really great for actions & votes)
-            try:
-                Subtype.objects.bulk_create(subobjects)
-            except Exception as e:
-                raise DataImportError(
-                    "{} while importing {} as {}".format(e, subobjects, Subtype)
-                )
-
-            # after import the subobjects, import their subsubobjects
-            for subobj, subrel in zip(subobjects, all_subrelated):
-                self._create_related(subobj, subrel, subsubdict)
+                # then gather this subobject's subsubobjects
+                self._build_related(subobj, subrelated, subsubdict, subobjects, True)
 
     def lookup_obj_id(self, pupa_id, model):
-        content_type = ContentType.objects.get_for_model(model)
-        try:
-            obj_id = Identifier.objects.get(
-                identifier=pupa_id,
-                content_type=content_type,
-                jurisdiction_id=self.jurisdiction_id,
-            ).object_id
-        except Identifier.DoesNotExist:
-            obj_id = None
+        return self.cache.get_pupa_ids(model).get(pupa_id)
 
-        return obj_id
+    def save_identifiers(self):
+        """ save the Identifiers for pupa_ids seen since the last call """
+        if self.new_identifiers:
+            # another process may have saved the same pupa_id since they were loaded
+            Identifier.objects.bulk_create(self.new_identifiers, ignore_conflicts=True)
+            self.new_identifiers = []
 
     def apply_transformers(self, data, transformers=None):
         if transformers is None:
@@ -472,4 +982,4 @@ class BaseImporter(object):
         return data
 
     def get_seen_sessions(self):
-        return self.session_cache.values()
+        return self.seen_sessions
@@ -1,4 +1,5 @@
-from .base import BaseImporter
+from django.db import connection
+from .base import BaseImporter, related_lookups
 from ..exceptions import InternalError
 from ..data.models import (
     Bill,
@@ -20,6 +21,40 @@ from .people import PersonImporter
 from .organizations import OrganizationImporter
 
 
+# unresolved RelatedBills in a jurisdiction, with the bills matching their session
+# identifier & bill identifier, limited to those in or pointing at the given sessions
+RELATED_BILL_CANDIDATES_SQL = """
+SELECT rb.id AS related_bill_id, MIN(target.id) AS target_id, COUNT(*) AS candidates
+FROM opencivicdata_relatedbill AS rb
+JOIN opencivicdata_bill AS source ON source.id = rb.bill_id
+JOIN opencivicdata_legislativesession AS source_session
+    ON source_session.id = source.legislative_session_id
+JOIN opencivicdata_legislativesession AS target_session
+    ON target_session.jurisdiction_id = source_session.jurisdiction_id
+    AND target_session.identifier = rb.legislative_session
+JOIN opencivicdata_bill AS target
+    ON target.legislative_session_id = target_session.id
+    AND target.identifier = rb.identifier
+WHERE source_session.jurisdiction_id = %(jurisdiction_id)s
+    AND rb.related_bill_id IS NULL
+    AND (
+        source_session.id IN %(session_ids)s OR target_session.id IN %(session_ids)s
+    )
+GROUP BY rb.id
+"""
+
+RESOLVE_RELATED_BILLS_SQL = (
+    """
+UPDATE opencivicdata_relatedbill AS rb
+SET related_bill_id = candidate.target_id
+FROM ("""
+    + RELATED_BILL_CANDIDATES_SQL
+    + """) AS candidate
+WHERE rb.id = candidate.related_bill_id AND candidate.candidates = 1
+"""
+)
+
+
 class BillImporter(BaseImporter):
     _type = "bill"
     model_class = Bill
@@ -48,10 +83,10 @@ class BillImporter(BaseImporter):
     }
     preserve_order = {"actions"}
 
-    def __init__(self, jurisdiction_id):
-        super(BillImporter, self).__init__(jurisdiction_id)
-        self.org_importer = OrganizationImporter(jurisdiction_id)
-        self.person_importer = PersonImporter(jurisdiction_id)
+    def __init__(self, jurisdiction_id, cache=None):
+        super(BillImporter, self).__init__(jurisdiction_id, cache)
+        self.org_importer = OrganizationImporter(jurisdiction_id, self.cache)
+        self.person_importer = PersonImporter(jurisdiction_id, self.cache)
 
     def get_object(self, bill):
         spec = {
@@ -65,6 +100,31 @@ class BillImporter(BaseImporter):
             "actions__related_entities", "versions__links", "documents__links"
         ).get(**spec)
 
+    def get_object_key(self, bill):
+        return (bill["legislative_session_id"], bill["identifier"])
+
+    def get_objects(self, keys):
+        bills = self.model_class.objects.prefetch_related(
+            *related_lookups(self.related_models)
+        ).filter(
+            legislative_session_id__in={session_id for session_id, _ in keys},
+            identifier__in={identifier for _, identifier in keys},
+        )
+        objects = {}
+        for bill in bills:
+            key = (bill.legislative_session_id, bill.identifier)
+            # the filter above can match identifiers from other sessions in the batch
+            if key not in keys:
+                continue
+            if key in objects:
+                raise self.model_class.MultipleObjectsReturned(
+                    "multiple bills found for {} in {}".format(
+                        bill.identifier, bill.legislative_session_id
+                    )
+                )
+            objects[key] = bill
+        return objects
+
     def limit_spec(self, spec):
         spec["legislative_session__jurisdiction_id"] = self.jurisdiction_id
         return spec
@@ -107,27 +167,34 @@ class BillImporter(BaseImporter):
         return data
 
     def postimport(self):
-        # go through all RelatedBill objs that are attached to a bill in this jurisdiction and
-        # are currently unresolved
-        for rb in RelatedBill.objects.filter(
-            bill__legislative_session__jurisdiction_id=self.jurisdiction_id,
-            related_bill=None,
-        ):
-            candidates = list(
-                Bill.objects.filter(
-                    legislative_session__identifier=rb.legislative_session,
-                    legislative_session__jurisdiction_id=self.jurisdiction_id,
-                    identifier=rb.identifier,
-                )
+        self.resolve_related_bills(self.get_seen_sessions())
+
+    def resolve_related_bills(self, session_ids):
+        """
+        link unresolved RelatedBills to the bills they refer to
+
+        only RelatedBills on bills in (or referring to) the given sessions are checked,
+        bills in other sessions can't have changed
+        """
+        session_ids = tuple(session_ids)
+        if not session_ids:
+            return
+        params = {"jurisdiction_id": self.jurisdiction_id, "session_ids": session_ids}
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                RELATED_BILL_CANDIDATES_SQL + " HAVING COUNT(*) > 1 LIMIT 1", params
             )
-            if len(candidates) == 1:
-                rb.related_bill = candidates[0]
-                rb.save()
-            elif len(candidates) > 1:  # pragma: no cover
+            ambiguous = cursor.fetchone()
+            if ambiguous:
                 # if we ever see this, we need to add additional fields on the relation
                 raise InternalError(
-                    "multiple related_bill candidates found for {}".format(rb)
+                    "multiple related_bill candidates found for {}".format(
+                        RelatedBill.objects.get(pk=ambiguous[0])
+                    )
                 )
+            cursor.execute(RESOLVE_RELATED_BILLS_SQL, params)
 
-    def update_computed_fields(self, obj):
-        update_bill_fields(obj, save=False)
+    def update_computed_fields(self, obj, related):
+        # the imported actions are what's in the database, no need to query them
+        update_bill_fields(obj, actions=related.get("actions"))
@@ -0,0 +1,72 @@
+"""
+PostgreSQL COPY support for inserting large numbers of related objects
+
+bulk_create builds one large parameterized INSERT, which gets slow for the hundreds of
+thousands of actions/votes/sponsorships in a first-time import of a session.  COPY
+streams the same rows in PostgreSQL's text format instead.
+"""
+import io
+from django.db import connection
+from psycopg2.extras import Json
+
+
+def _escape(value):
+    """ escape a string for COPY's text format """
+    return (
+        value.replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _array_literal(values):
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+        else:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            items.append('"' + value + '"')
+    return "{" + ",".join(items) + "}"
+
+
+def copy_value(value):
+    """ convert a value prepared for the database to a COPY text column """
+    if value is None:
+        return "\\N"
+    elif isinstance(value, bool):
+        return "t" if value else "f"
+    elif isinstance(value, Json):
+        # JSONField values are adapted rather than serialized on older Django
+        value = value.dumps(value.adapted)
+    elif isinstance(value, (list, tuple)):
+        value = _array_literal(value)
+    return _escape(str(value))
+
+
+def copy_insert(model, objects):
+    """
+    insert unsaved objects of model using COPY
+
+    like bulk_create this doesn't call save() or send signals, primary keys must
+    already be set on the objects (as they are for models using UUID ids)
+    """
+    fields = model._meta.concrete_fields
+    buffer = io.StringIO()
+    for obj in objects:
+        row = (
+            copy_value(field.get_db_prep_save(field.pre_save(obj, True), connection))
+            for field in fields
+        )
+        buffer.write("\t".join(row))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    quote_name = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote_name(model._meta.db_table),
+        ", ".join(quote_name(field.column) for field in fields),
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
@@ -4,10 +4,23 @@ functions in this module should take a single object and update it in place
 optionally, they can take a save parameter, that should default to False
 but can be set to True to force a save if changes were made
 (this allows for usage from CLI)
+
+bulk_* functions compute the same fields for every object in a jurisdiction with a
+single SQL statement, the single object versions are the reference implementation
 """
+from django.db import connection
+
 
+def update_bill_fields(bill, *, save=False, actions=None):
+    """
+    actions may be a list of action dicts (in order) to use instead of querying the
+    bill's actions, e.g. when they are being imported
+    """
+    if actions is None:
+        actions = bill.actions.order_by("order").values(
+            "date", "description", "classification"
+        )
 
-def update_bill_fields(bill, *, save=False):
     first_action_date = None
     latest_action_date = None
     latest_action_description = ""
@@ -16,16 +29,17 @@ def update_bill_fields(bill, *, save=False):
     # iterate over according to order
     # first action date will use first by order (<)
     # latest will use latest by order (>=)
-    for action in bill.actions.order_by("order"):
-        if not first_action_date or action.date < first_action_date:
-            first_action_date = action.date
-        if not latest_action_date or action.date >= latest_action_date:
-            latest_action_date = action.date
-            latest_action_description = action.description
-        if "passage" in action.classification and (
-            not latest_passage_date or action.date >= latest_passage_date
+    for action in actions:
+        date = action["date"]
+        if not first_action_date or date < first_action_date:
+            first_action_date = date
+        if not latest_action_date or date >= latest_action_date:
+            latest_action_date = date
+            latest_action_description = action["description"]
+        if "passage" in action["classification"] and (
+            not latest_passage_date or date >= latest_passage_date
         ):
-            latest_passage_date = action.date
+            latest_passage_date = date
 
     if (
         bill.first_action_date != first_action_date
@@ -37,4 +51,61 @@ def update_bill_fields(bill, *, save=False):
         bill.latest_passage_date = latest_passage_date
         bill.latest_action_date = latest_action_date
         bill.latest_action_description = latest_action_description
-        bill.save()
+        if save:
+            bill.save()
+
+
+# dates are strings, compared with COLLATE "C" to match Python's comparisons
+BULK_UPDATE_BILL_FIELDS_SQL = """
+UPDATE opencivicdata_bill AS bill
+SET first_action_date = computed.first_action_date,
+    latest_action_date = computed.latest_action_date,
+    latest_action_description = computed.latest_action_description,
+    latest_passage_date = computed.latest_passage_date,
+    updated_at = now()
+FROM (
+    SELECT bill.id,
+        action.first_action_date,
+        action.date AS latest_action_date,
+        COALESCE(action.description, '') AS latest_action_description,
+        action.latest_passage_date
+    FROM opencivicdata_bill AS bill
+    JOIN opencivicdata_legislativesession AS session
+        ON session.id = bill.legislative_session_id
+    LEFT JOIN (
+        SELECT bill_id, date, description,
+            MIN(date COLLATE "C") OVER bill_actions AS first_action_date,
+            MAX(date COLLATE "C")
+                FILTER (WHERE 'passage' = ANY(classification))
+                OVER bill_actions AS latest_passage_date,
+            ROW_NUMBER() OVER (
+                PARTITION BY bill_id ORDER BY date COLLATE "C" DESC, "order" DESC
+            ) AS latest
+        FROM opencivicdata_billaction
+        WHERE bill_id IN (
+            SELECT bill.id FROM opencivicdata_bill AS bill
+            JOIN opencivicdata_legislativesession AS session
+                ON session.id = bill.legislative_session_id
+            WHERE session.jurisdiction_id = %(jurisdiction_id)s
+        )
+        WINDOW bill_actions AS (PARTITION BY bill_id)
+    ) AS action ON action.bill_id = bill.id AND action.latest = 1
+    WHERE session.jurisdiction_id = %(jurisdiction_id)s
+) AS computed
+WHERE bill.id = computed.id AND (
+    bill.first_action_date IS DISTINCT FROM computed.first_action_date
+    OR bill.latest_action_date IS DISTINCT FROM computed.latest_action_date
+    OR bill.latest_action_description IS DISTINCT FROM
+        computed.latest_action_description
+    OR bill.latest_passage_date IS DISTINCT FROM computed.latest_passage_date
+)
+"""
+
+
+def bulk_update_bill_fields(jurisdiction_id):
+    """ update_bill_fields for every bill in a jurisdiction, returns # of bills changed """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            BULK_UPDATE_BILL_FIELDS_SQL, {"jurisdiction_id": jurisdiction_id}
+        )
+        return cursor.rowcount
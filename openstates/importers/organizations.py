@@ -1,5 +1,7 @@
+from collections import defaultdict
 from django.db.models import Q
 from .base import BaseImporter
+from .. import settings
 from ..data.models import Organization
 
 
@@ -15,3 +17,49 @@ class OrganizationImporter(BaseImporter):
         if name:
             return Q(**spec) & Q(name=name)
         return spec
+
+    def load_pseudo_id_index(self):
+        """
+        Load the jurisdiction's organizations and all parties (which aren't limited to
+        a jurisdiction), mirroring the scope of limit_spec.
+        """
+        index = {
+            "name": defaultdict(set),
+            "classification": defaultdict(set),
+            "party_name": defaultdict(set),
+            "party": set(),
+        }
+        orgs = Organization.objects.filter(
+            Q(jurisdiction_id=self.jurisdiction_id) | Q(classification="party")
+        )
+        for org_id, name, classification, jurisdiction_id in orgs.values_list(
+            "id", "name", "classification", "jurisdiction_id"
+        ):
+            if classification == "party":
+                index["party"].add(org_id)
+                index["party_name"][name].add(org_id)
+            if jurisdiction_id == self.jurisdiction_id:
+                index["name"][name].add(org_id)
+                index["classification"][classification].add(org_id)
+        return index
+
+    def lookup_pseudo_id(self, spec):
+        if not settings.IMPORT_PRELOAD_PSEUDO_IDS:
+            return None
+        keys = set(spec.keys())
+        # anything else is resolved with a query
+        if not keys or not keys <= {"name", "classification"}:
+            return None
+        index = self.get_pseudo_id_index()
+
+        if spec.get("classification") == "party":
+            if "name" in spec:
+                return set(index["party_name"].get(spec["name"], set()))
+            return set(index["party"])
+
+        ids = None
+        for key in ("name", "classification"):
+            if key in spec:
+                matches = index[key].get(spec[key], set())
+                ids = set(matches) if ids is None else ids & matches
+        return ids
@@ -1,6 +1,8 @@
+from collections import defaultdict
 from django.db.models import Q
 from .base import BaseImporter
-from ..data.models import Person
+from .. import settings
+from ..data.models import Person, PersonIdentifier, PersonName
 
 
 class PersonImporter(BaseImporter):
@@ -21,3 +23,51 @@ class PersonImporter(BaseImporter):
             )
         spec["memberships__organization__jurisdiction_id"] = self.jurisdiction_id
         return spec
+
+    def load_pseudo_id_index(self):
+        """
+        Load names & identifiers of everyone with a membership in the jurisdiction,
+        mirroring the scope of limit_spec.
+        """
+        index = {
+            "name": defaultdict(set),
+            "other_names": defaultdict(set),
+            "family_name": defaultdict(set),
+            "identifiers": defaultdict(set),
+        }
+        people = Person.objects.filter(
+            memberships__organization__jurisdiction_id=self.jurisdiction_id
+        )
+        for person_id, name, family_name in people.values_list(
+            "id", "name", "family_name"
+        ).distinct():
+            index["name"][name].add(person_id)
+            index["family_name"][family_name].add(person_id)
+        for person_id, name in PersonName.objects.filter(person__in=people).values_list(
+            "person_id", "name"
+        ):
+            index["other_names"][name].add(person_id)
+        for person_id, scheme, identifier in PersonIdentifier.objects.filter(
+            person__in=people
+        ).values_list("person_id", "scheme", "identifier"):
+            index["identifiers"][(scheme, identifier)].add(person_id)
+        return index
+
+    def lookup_pseudo_id(self, spec):
+        if not settings.IMPORT_PRELOAD_PSEUDO_IDS:
+            return None
+        keys = set(spec.keys())
+        # anything else is resolved with a query
+        if keys not in ({"name"}, {"identifiers__scheme", "identifiers__identifier"}):
+            return None
+        index = self.get_pseudo_id_index()
+
+        if keys == {"name"}:
+            name = spec["name"]
+            return (
+                index["name"].get(name, set())
+                | index["other_names"].get(name, set())
+                | index["family_name"].get(name, set())
+            )
+        key = (spec["identifiers__scheme"], spec["identifiers__identifier"])
+        return set(index["identifiers"].get(key, set()))
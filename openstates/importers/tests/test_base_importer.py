@@ -13,8 +13,15 @@ from openstates.data.models import (
     Organization,
 )
 from openstates.scrape import Bill as ScrapeBill
-from openstates.importers.base import omnihash, BaseImporter
+from openstates.importers.base import (
+    omnihash,
+    content_hash,
+    items_differ,
+    json_stream,
+    BaseImporter,
+)
 from openstates.importers import BillImporter
+from openstates import settings
 from openstates.exceptions import UnresolvedIdError, DataImportError
 
 
@@ -46,6 +53,75 @@ def test_omnihash_python_types():
     )
 
 
+def test_content_hash():
+    # key order doesn't matter, list order does
+    assert content_hash({"a": 1, "b": [1, 2]}) == content_hash({"b": [1, 2], "a": 1})
+    assert content_hash({"a": 1, "b": [1, 2]}) != content_hash({"a": 1, "b": [2, 1]})
+    # digest is stable across processes
+    assert (
+        content_hash({"a": "test"})
+        == "55961e7eea9c3124858ac9039054bc8f24e3d876274e4168f0e13e53d7d20c1d"
+    )
+
+
+class FakeRelated:
+    def __init__(self, items):
+        self.items = items
+
+    def all(self):
+        return self.items
+
+
+class FakeItem:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            if isinstance(v, list) and v and isinstance(v[0], FakeItem):
+                v = FakeRelated(v)
+            setattr(self, k, v)
+
+
+def test_items_differ():
+    jsonitems = [{"a": 1, "b": ["x"]}, {"a": 2, "b": []}, {"a": 1, "b": ["x"]}]
+    # same items in a different order, including duplicates
+    dbitems = [FakeItem(a=2, b=[]), FakeItem(a=1, b=["x"]), FakeItem(a=1, b=["x"])]
+    assert not items_differ(jsonitems, dbitems, {})
+    # a duplicate on one side isn't matched by a distinct item on the other
+    dbitems[2] = FakeItem(a=2, b=[])
+    assert items_differ(jsonitems, dbitems, {})
+    assert items_differ(jsonitems, dbitems[:2], {})
+    assert not items_differ([], [], {})
+
+
+def test_items_differ_order():
+    jsonitems = [{"a": 1}, {"a": 2}]
+    assert not items_differ(
+        jsonitems, [FakeItem(a=2, order=1), FakeItem(a=1, order=0)], {}
+    )
+    assert items_differ(jsonitems, [FakeItem(a=2, order=0), FakeItem(a=1, order=1)], {})
+    assert items_differ(jsonitems, [FakeItem(a=1, order=0), FakeItem(a=2, order=5)], {})
+
+
+def test_items_differ_subfields():
+    subfields = {"links": (None, "parent_id", {})}
+    jsonitems = [
+        {"note": "v1", "links": [{"url": "a"}, {"url": "b"}]},
+        {"note": "v2", "links": []},
+    ]
+    dbitems = [
+        FakeItem(note="v2", links=FakeRelated([])),
+        FakeItem(note="v1", links=[FakeItem(url="b"), FakeItem(url="a")]),
+    ]
+    assert not items_differ(jsonitems, dbitems, subfields)
+    dbitems[1] = FakeItem(note="v1", links=[FakeItem(url="b"), FakeItem(url="c")])
+    assert items_differ(jsonitems, dbitems, subfields)
+    # subitems attached to the wrong parent
+    dbitems = [
+        FakeItem(note="v1", links=FakeRelated([])),
+        FakeItem(note="v2", links=[FakeItem(url="a"), FakeItem(url="b")]),
+    ]
+    assert items_differ(jsonitems, dbitems, subfields)
+
+
 def test_import_directory():
     # write out some temp data to filesystem
     datadir = tempfile.mkdtemp()
@@ -73,6 +149,65 @@ def test_import_directory():
     shutil.rmtree(datadir)
 
 
+@pytest.mark.parametrize("workers", [0, 3])
+def test_json_stream_ordered(workers):
+    datadir = tempfile.mkdtemp()
+    for n in range(50):
+        with open(os.path.join(datadir, "test_{:03d}.json".format(n)), "w") as f:
+            json.dump({"n": n}, f)
+
+    orig = settings.IMPORT_DECODE_WORKERS
+    settings.IMPORT_DECODE_WORKERS = workers
+    try:
+        ordered = list(json_stream(datadir, "test"))
+        unordered = list(json_stream(datadir, "test", ordered=False))
+    finally:
+        settings.IMPORT_DECODE_WORKERS = orig
+        shutil.rmtree(datadir)
+
+    assert ordered == [{"n": n} for n in range(50)]
+    assert sorted(item["n"] for item in unordered) == list(range(50))
+
+
+@pytest.mark.parametrize("workers", [0, 3])
+def test_json_stream_jsonl(workers):
+    datadir = tempfile.mkdtemp()
+    with open(os.path.join(datadir, "test_a.json"), "w") as f:
+        json.dump({"n": -1}, f)
+    with open(os.path.join(datadir, "test.jsonl"), "w") as f:
+        for n in range(250):
+            f.write(json.dumps({"n": n}) + "\n")
+
+    orig = settings.IMPORT_DECODE_WORKERS
+    settings.IMPORT_DECODE_WORKERS = workers
+    try:
+        items = list(json_stream(datadir, "test"))
+    finally:
+        settings.IMPORT_DECODE_WORKERS = orig
+        shutil.rmtree(datadir)
+
+    assert items == [{"n": n} for n in range(-1, 250)]
+
+
+def test_json_stream_decode_error():
+    datadir = tempfile.mkdtemp()
+    with open(os.path.join(datadir, "test_a.json"), "w") as f:
+        json.dump({"test": "A"}, f)
+    with open(os.path.join(datadir, "test_b.json"), "w") as f:
+        f.write("{not json")
+
+    orig = settings.IMPORT_DECODE_WORKERS
+    settings.IMPORT_DECODE_WORKERS = 2
+    try:
+        stream = json_stream(datadir, "test")
+        assert next(stream) == {"test": "A"}
+        with pytest.raises(ValueError):
+            next(stream)
+    finally:
+        settings.IMPORT_DECODE_WORKERS = orig
+        shutil.rmtree(datadir)
+
+
 def test_apply_transformers():
     transformers = {
         "capitalize": lambda x: x.upper(),
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from openstates.scrape import Bill as ScrapeBill
 from openstates.importers import BillImporter
 from openstates.data.models import (
@@ -8,10 +10,14 @@ from openstates.data.models import (
     Membership,
     Division,
     Bill,
+    BillAction,
+    BillActionRelatedEntity,
+    RelatedBill,
+    LegislativeSession,
 )
 from openstates.utils.transformers import fix_bill_id
 from openstates.utils.generic import _make_pseudo_id
-from openstates.exceptions import DuplicateItemError
+from openstates.exceptions import DuplicateItemError, InternalError
 
 
 def create_jurisdiction():
@@ -467,3 +473,413 @@ def test_bill_duplicate_actions_ordering():
     assert result["bill"]["insert"] == 0
     assert result["bill"]["update"] == 0
     assert result["bill"]["noop"] == 1
+
+
+@pytest.mark.django_db
+def test_bill_batch_lookup():
+    create_jurisdiction()
+    create_org()
+
+    def _bills():
+        bills = []
+        for n in range(5):
+            bill = ScrapeBill(f"HB {n}", "1900", "Some Bill", chamber="lower")
+            bill.add_action("introduced", "1900-01-01", chamber="lower")
+            bill.add_version_link(
+                "printing", f"http://example.com/{n}.pdf", media_type="application/pdf"
+            )
+            bills.append(bill.as_dict())
+        return bills
+
+    result = BillImporter("jid").import_data(_bills())
+    assert result["bill"]["insert"] == 5
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = BillImporter("jid").import_data(_bills())
+    assert result["bill"]["noop"] == 5
+
+    # existing bills are looked up together, not once per bill
+    bill_queries = [
+        q for q in ctx.captured_queries if 'FROM "opencivicdata_bill" ' in q["sql"]
+    ]
+    assert len(bill_queries) == 1
+
+
+@pytest.mark.django_db
+def test_bill_import_hash():
+    create_jurisdiction()
+    create_org()
+
+    def _bill(title):
+        bill = ScrapeBill("HB 1", "1900", title, chamber="lower")
+        bill.add_action("this is an action", chamber="lower", date="1900-01-01")
+        return bill.as_dict()
+
+    result = BillImporter("jid").import_data([_bill("First Bill")])
+    assert result["bill"]["insert"] == 1
+    obj = Bill.objects.get()
+    assert obj.import_hash
+    last_hash = obj.import_hash
+
+    # identical data short-circuits the comparison entirely, even though the
+    # actions were removed from the database behind the importer's back
+    obj.actions.all().delete()
+    result = BillImporter("jid").import_data([_bill("First Bill")])
+    assert result["bill"]["noop"] == 1
+    assert Bill.objects.get().actions.count() == 0
+
+    # changed data is compared & stored with a new hash
+    result = BillImporter("jid").import_data([_bill("1st Bill")])
+    assert result["bill"]["update"] == 1
+    obj = Bill.objects.get()
+    assert obj.actions.count() == 1
+    assert obj.import_hash != last_hash
+
+
+@pytest.mark.django_db
+def test_bill_force_import():
+    from openstates import settings
+
+    create_jurisdiction()
+    create_org()
+
+    def _bill():
+        bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+        bill.add_action("this is an action", chamber="lower", date="1900-01-01")
+        return bill.as_dict()
+
+    BillImporter("jid").import_data([_bill()])
+
+    # the database drifted from what was imported
+    Bill.objects.update(title="Edited")
+    Bill.objects.get().actions.all().delete()
+    result = BillImporter("jid").import_data([_bill()])
+    assert result["bill"]["noop"] == 1
+
+    # ignoring the hash compares the data & repairs the bill
+    settings.IMPORT_SKIP_UNCHANGED = False
+    try:
+        result = BillImporter("jid").import_data([_bill()])
+    finally:
+        settings.IMPORT_SKIP_UNCHANGED = True
+    assert result["bill"]["update"] == 1
+    obj = Bill.objects.get()
+    assert obj.title == "First Bill"
+    assert obj.actions.count() == 1
+
+    # unchanged objects with an up to date hash aren't written to at all
+    settings.IMPORT_SKIP_UNCHANGED = False
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            result = BillImporter("jid").import_data([_bill()])
+    finally:
+        settings.IMPORT_SKIP_UNCHANGED = True
+    assert result["bill"]["noop"] == 1
+    assert not [q for q in ctx.captured_queries if q["sql"].startswith("UPDATE")]
+
+
+@pytest.mark.django_db
+def test_bill_computed_fields_from_import():
+    create_jurisdiction()
+    create_org()
+
+    def _bill(*dates):
+        bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+        for date in dates:
+            bill.add_action("action on " + date, chamber="lower", date=date)
+        return bill.as_dict()
+
+    with CaptureQueriesContext(connection) as ctx:
+        BillImporter("jid").import_data([_bill("1900-01-01", "1900-01-02")])
+    # computed fields come from the imported actions, not a query for them
+    assert not [
+        q
+        for q in ctx.captured_queries
+        if q["sql"].startswith("SELECT") and "opencivicdata_billaction" in q["sql"]
+    ]
+    obj = Bill.objects.get()
+    assert obj.first_action_date == "1900-01-01"
+    assert obj.latest_action_date == "1900-01-02"
+    assert obj.latest_action_description == "action on 1900-01-02"
+
+    BillImporter("jid").import_data([_bill("1900-01-01", "1900-01-03")])
+    obj = Bill.objects.get()
+    assert obj.latest_action_date == "1900-01-03"
+    assert obj.latest_action_description == "action on 1900-01-03"
+
+
+@pytest.mark.django_db
+def test_bill_import_hash_backfill():
+    create_jurisdiction()
+    create_org()
+
+    bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+    BillImporter("jid").import_data([bill.as_dict()])
+    # objects imported before hashes were stored are still compared normally,
+    # and get a hash without being marked as updated
+    Bill.objects.update(import_hash="")
+    last_updated = Bill.objects.get().updated_at
+
+    result = BillImporter("jid").import_data([bill.as_dict()])
+    assert result["bill"]["noop"] == 1
+    obj = Bill.objects.get()
+    assert obj.import_hash
+    assert obj.updated_at == last_updated
+
+
+@pytest.mark.django_db
+def test_bill_update_keeps_unchanged_actions():
+    create_jurisdiction()
+    create_org()
+
+    def _bill(*actions):
+        bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+        for description, date in actions:
+            bill.add_action(description, chamber="lower", date=date)
+        return bill.as_dict()
+
+    BillImporter("jid").import_data(
+        [_bill(("introduced", "1900-01-01"), ("referred", "1900-01-02"))]
+    )
+    ids = {a.description: a.id for a in Bill.objects.get().actions.all()}
+
+    # adding an action only creates the new one
+    result = BillImporter("jid").import_data(
+        [
+            _bill(
+                ("introduced", "1900-01-01"),
+                ("referred", "1900-01-02"),
+                ("passed", "1900-01-03"),
+            )
+        ]
+    )
+    assert result["bill"]["update"] == 1
+    actions = list(Bill.objects.get().actions.all())
+    assert [a.description for a in actions] == ["introduced", "referred", "passed"]
+    assert actions[0].id == ids["introduced"]
+    assert actions[1].id == ids["referred"]
+
+    # reordering & removing keeps the remaining objects, renumbered
+    result = BillImporter("jid").import_data(
+        [_bill(("passed", "1900-01-03"), ("introduced", "1900-01-01"))]
+    )
+    assert result["bill"]["update"] == 1
+    actions = list(Bill.objects.get().actions.all())
+    assert [(a.description, a.order) for a in actions] == [
+        ("passed", 0),
+        ("introduced", 1),
+    ]
+    assert actions[1].id == ids["introduced"]
+
+
+@pytest.mark.django_db
+def test_bill_update_edits_actions_in_place():
+    create_jurisdiction()
+    create_org()
+
+    def _bill(description, entity):
+        bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+        bill.add_action("introduced", chamber="lower", date="1900-01-01")
+        action = bill.add_action(description, chamber="lower", date="1900-01-02")
+        action.add_related_entity(entity, "organization")
+        return bill.as_dict()
+
+    BillImporter("jid").import_data([_bill("referred", "Finance")])
+    ids = [a.id for a in Bill.objects.get().actions.all()]
+
+    # a changed action (or related entity) is updated, keeping its id
+    result = BillImporter("jid").import_data([_bill("referred to", "Judiciary")])
+    assert result["bill"]["update"] == 1
+    actions = list(Bill.objects.get().actions.all())
+    assert [a.id for a in actions] == ids
+    assert actions[1].description == "referred to"
+    assert [e.name for e in actions[1].related_entities.all()] == ["Judiciary"]
+
+
+@pytest.mark.django_db
+def test_bill_update_mixed_related_entities():
+    create_jurisdiction()
+    org = create_org()
+    for name in ("Smith A", "Smith B"):
+        person = Person.objects.create(name=name)
+        Membership.objects.create(person_id=person.id, organization_id=org.id)
+
+    def _bill(sponsor):
+        bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+        action = bill.add_action("referred", chamber="lower", date="1900-01-01")
+        action.add_related_entity("Finance", "organization")
+        # a later action's entity has a person_id, which the first one doesn't
+        action = bill.add_action("amended", chamber="lower", date="1900-01-02")
+        action.add_related_entity(
+            "Smith", "person", entity_id=_make_pseudo_id(name=sponsor)
+        )
+        return bill.as_dict()
+
+    BillImporter("jid").import_data([_bill("Smith A")])
+    result = BillImporter("jid").import_data([_bill("Smith B")])
+    assert result["bill"]["update"] == 1
+    entity = BillActionRelatedEntity.objects.get(person__isnull=False)
+    assert entity.person.name == "Smith B"
+
+
+@pytest.mark.django_db
+def test_bill_update_replace_related():
+    create_jurisdiction()
+    create_org()
+    from openstates import settings
+
+    def _bill(*descriptions):
+        bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+        for description in descriptions:
+            bill.add_action(description, chamber="lower", date="1900-01-01")
+        return bill.as_dict()
+
+    BillImporter("jid").import_data([_bill("introduced")])
+    first_id = Bill.objects.get().actions.get().id
+
+    # without diffing, any change replaces the whole collection
+    settings.IMPORT_DIFF_RELATED = False
+    try:
+        result = BillImporter("jid").import_data([_bill("introduced", "referred")])
+    finally:
+        settings.IMPORT_DIFF_RELATED = True
+    assert result["bill"]["update"] == 1
+    actions = list(Bill.objects.get().actions.all())
+    assert [a.description for a in actions] == ["introduced", "referred"]
+    assert first_id not in {a.id for a in actions}
+
+
+@pytest.mark.django_db
+def test_bill_related_bulk_create():
+    create_jurisdiction()
+    create_org()
+
+    bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+    for n in range(3):
+        bill.add_version_link(
+            f"version {n}", f"http://example.com/{n}.pdf", media_type="application/pdf"
+        )
+        bill.add_version_link(
+            f"version {n}", f"http://example.com/{n}.txt", media_type="text/plain"
+        )
+
+    with CaptureQueriesContext(connection) as ctx:
+        BillImporter("jid").import_data([bill.as_dict()])
+
+    # one insert for all the versions and one for all of their links
+    inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+    assert len([q for q in inserts if '"opencivicdata_billversion"' in q]) == 1
+    assert len([q for q in inserts if '"opencivicdata_billversionlink"' in q]) == 1
+    assert Bill.objects.get().versions.count() == 3
+    for version in Bill.objects.get().versions.all():
+        assert version.links.count() == 2
+
+
+@pytest.mark.django_db
+def test_bill_related_copy():
+    create_jurisdiction()
+    create_org()
+    from openstates import settings
+
+    bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+    for n in range(5):
+        bill.add_action(f"action\t{n}", chamber="lower", date="1900-01-01")
+    bill.add_sponsorship(
+        "Jane Smith", classification="lead sponsor", entity_type="person", primary=True
+    )
+
+    settings.IMPORT_COPY_THRESHOLD = 2
+    try:
+        with CaptureQueriesContext(connection) as ctx:
+            BillImporter("jid").import_data([bill.as_dict()])
+    finally:
+        settings.IMPORT_COPY_THRESHOLD = 1000
+
+    inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+    assert not [q for q in inserts if '"opencivicdata_billaction"' in q]
+    # below the threshold, bulk_create is still used
+    assert [q for q in inserts if '"opencivicdata_billsponsorship"' in q]
+
+    actions = list(Bill.objects.get().actions.all())
+    assert [a.description for a in actions] == [f"action\t{n}" for n in range(5)]
+    assert [a.order for a in actions] == list(range(5))
+
+
+@pytest.mark.django_db
+def test_bill_batch_related_copy():
+    create_jurisdiction()
+    create_org()
+
+    # no bill has anywhere near IMPORT_COPY_THRESHOLD actions, but the batch does
+    bills = []
+    for n in range(60):
+        bill = ScrapeBill(f"HB {n}", "1900", "A Bill", chamber="lower")
+        for day in range(1, 21):
+            bill.add_action("action", chamber="lower", date=f"1900-01-{day:02d}")
+        bills.append(bill.as_dict())
+
+    with CaptureQueriesContext(connection) as ctx:
+        result = BillImporter("jid").import_data(bills)
+    assert result["bill"]["insert"] == 60
+
+    inserts = [q["sql"] for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+    assert not [q for q in inserts if '"opencivicdata_billaction"' in q]
+    assert BillAction.objects.count() == 1200
+    bill = Bill.objects.get(identifier="HB 7")
+    assert [a.order for a in bill.actions.all()] == list(range(20))
+    # computed fields come from the imported actions
+    assert bill.latest_action_date == "1900-01-20"
+
+
+@pytest.mark.django_db
+def test_resolve_related_bills_touched_sessions():
+    create_jurisdiction()
+    create_org()
+
+    bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+    bill.add_related_bill("HB 99", legislative_session="1899", relation_type="prior")
+    BillImporter("jid").import_data([bill.as_dict()])
+    assert RelatedBill.objects.get().related_bill is None
+
+    # importing the bill it refers to (in another session) resolves it
+    prior = ScrapeBill("HB 99", "1899", "Prior Bill", chamber="lower")
+    BillImporter("jid").import_data([prior.as_dict()])
+    assert RelatedBill.objects.get().related_bill.identifier == "HB 99"
+
+    # unresolved RelatedBills outside of the imported sessions are left alone
+    RelatedBill.objects.update(related_bill=None)
+    other_session = LegislativeSession.objects.create(
+        identifier="1901", name="1901", jurisdiction_id="jid"
+    )
+    importer = BillImporter("jid")
+    importer.resolve_related_bills([other_session.id])
+    assert RelatedBill.objects.get().related_bill is None
+    # the RelatedBill's target session is enough to find it
+    importer.resolve_related_bills([importer.get_session_id("1899")])
+    assert RelatedBill.objects.get().related_bill.identifier == "HB 99"
+
+
+@pytest.mark.django_db
+def test_resolve_related_bills_ambiguous():
+    create_jurisdiction()
+    create_org()
+    Organization.objects.create(
+        id="upper-id", name="Senate", classification="upper", jurisdiction_id="jid"
+    )
+
+    # bills are unique per session now, but older data may have duplicates
+    session = LegislativeSession.objects.get(identifier="1899")
+    for org_id in ("org-id", "upper-id"):
+        Bill.objects.create(
+            identifier="HB 99",
+            title="Prior Bill",
+            legislative_session=session,
+            from_organization_id=org_id,
+        )
+
+    bill = ScrapeBill("HB 1", "1900", "First Bill", chamber="lower")
+    bill.add_related_bill("HB 99", legislative_session="1899", relation_type="prior")
+    importer = BillImporter("jid")
+    importer.import_data([bill.as_dict()], postimport=False)
+    with pytest.raises(InternalError):
+        importer.resolve_related_bills([session.id])
@@ -0,0 +1,66 @@
+import pytest
+from openstates.data.models import (
+    Jurisdiction,
+    Division,
+    Organization,
+    Bill,
+    BillAction,
+    BillDocument,
+)
+from openstates.importers.bulk import copy_value, copy_insert
+
+
+def create_bill():
+    Division.objects.create(id="ocd-division/country:us", name="USA")
+    j = Jurisdiction.objects.create(id="jid", division_id="ocd-division/country:us")
+    session = j.legislative_sessions.create(identifier="1900", name="1900")
+    org = Organization.objects.create(
+        name="House", classification="lower", jurisdiction=j
+    )
+    bill = Bill.objects.create(
+        identifier="HB 1", title="First Bill", legislative_session=session
+    )
+    return bill, org
+
+
+def test_copy_value():
+    assert copy_value(None) == "\\N"
+    assert copy_value(True) == "t"
+    assert copy_value(3) == "3"
+    assert copy_value("tab\there\nand\\newline") == "tab\\there\\nand\\\\newline"
+    assert copy_value(["a", 'quote"d', None]) == '{"a","quote\\\\"d",NULL}'
+
+
+@pytest.mark.django_db
+def test_copy_insert():
+    bill, org = create_bill()
+    descriptions = ["plain", "tab\there", "new\nline", "back\\slash", 'quote"d', ""]
+    actions = [
+        BillAction(
+            bill=bill,
+            organization=org,
+            description=description,
+            date="1900-01-01",
+            classification=[description, "passage"],
+            order=order,
+        )
+        for order, description in enumerate(descriptions)
+    ]
+    copy_insert(BillAction, actions)
+
+    saved = list(bill.actions.all())
+    assert [a.id for a in saved] == [a.id for a in actions]
+    assert [a.description for a in saved] == descriptions
+    assert [a.classification for a in saved] == [
+        [description, "passage"] for description in descriptions
+    ]
+
+
+@pytest.mark.django_db
+def test_copy_insert_json():
+    bill, _ = create_bill()
+    document = BillDocument(
+        bill=bill, note="fiscal note", date="1900", extras={"a": ["b\tc", None]}
+    )
+    copy_insert(BillDocument, [document])
+    assert bill.documents.get().extras == {"a": ["b\tc", None]}
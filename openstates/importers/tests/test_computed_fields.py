@@ -1,6 +1,6 @@
 import pytest
 from openstates.data.models import Jurisdiction, Division, Organization, Bill
-from ..computed_fields import update_bill_fields
+from ..computed_fields import update_bill_fields, bulk_update_bill_fields
 
 
 def create_data():
@@ -45,3 +45,57 @@ def test_update_bill_basic():
     assert b.latest_action_date == "2020-04-22"
     assert b.latest_passage_date == "2020-04-21"
     assert b.latest_action_description == "Amended in Senate"
+
+
+@pytest.mark.django_db
+def test_bulk_update_bill_fields():
+    session, org = create_data()
+    actions = [
+        [],
+        [
+            ("2020-04-20", "Introduced", 100, []),
+            ("2020-04-21", "Passed", 2, ["passage"]),
+        ],
+        # ties on the latest date are broken by order
+        [("2020-04-22", "Something Else", 3, []), ("2020-04-22", "Amended", 4, [])],
+        [("2020-04-22", "Amended", 4, []), ("2020-04-22", "Something Else", 3, [])],
+        # dates compared as strings, like Python does
+        [
+            ("2020-04-22T10:00:00", "Later", 1, ["passage"]),
+            ("2020-04-22", "Earlier", 2, ["passage", "became-law"]),
+            ("2020-04-21", "Z", 3, []),
+        ],
+    ]
+    for n, bill_actions in enumerate(actions):
+        b = Bill.objects.create(
+            identifier=f"HB{n}",
+            title="title",
+            legislative_session_id=session,
+            # stale values that should be replaced
+            latest_action_description="stale",
+            first_action_date="1999-01-01",
+        )
+        for date, description, order, classification in bill_actions:
+            b.actions.create(
+                date=date,
+                description=description,
+                order=order,
+                organization=org,
+                classification=classification,
+            )
+
+    assert bulk_update_bill_fields("jid") == len(actions)
+
+    for bill in Bill.objects.all():
+        expected = Bill.objects.get(pk=bill.pk)
+        update_bill_fields(expected)
+        for field in (
+            "first_action_date",
+            "latest_action_date",
+            "latest_action_description",
+            "latest_passage_date",
+        ):
+            assert getattr(bill, field) == getattr(expected, field)
+
+    # nothing changes on a second run
+    assert bulk_update_bill_fields("jid") == 0
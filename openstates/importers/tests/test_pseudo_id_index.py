@@ -0,0 +1,131 @@
+import pytest
+from openstates.data.models import (
+    Jurisdiction,
+    Division,
+    Organization,
+    Person,
+    Membership,
+)
+from openstates.importers import PersonImporter, OrganizationImporter
+from openstates.utils import get_pseudo_id
+from openstates.utils.generic import _make_pseudo_id
+from openstates.exceptions import UnresolvedIdError
+
+
+def create_data():
+    Division.objects.create(id="ocd-division/country:us", name="USA")
+    Jurisdiction.objects.create(id="jid", division_id="ocd-division/country:us")
+    Jurisdiction.objects.create(id="other", division_id="ocd-division/country:us")
+    house = Organization.objects.create(
+        id="house", name="House", classification="lower", jurisdiction_id="jid"
+    )
+    Organization.objects.create(
+        id="senate", name="Senate", classification="upper", jurisdiction_id="jid"
+    )
+    Organization.objects.create(
+        id="cmte", name="Finance", classification="committee", jurisdiction_id="jid"
+    )
+    Organization.objects.create(
+        id="other-cmte",
+        name="Finance",
+        classification="committee",
+        jurisdiction_id="other",
+    )
+    Organization.objects.create(
+        id="other-house", name="House", classification="lower", jurisdiction_id="other"
+    )
+    Organization.objects.create(
+        id="dem", name="Democratic", classification="party", jurisdiction_id="other"
+    )
+
+    jane = Person.objects.create(name="Jane Smith", family_name="Smith")
+    jane.other_names.create(name="J. Smith")
+    jane.identifiers.create(scheme="legid", identifier="123")
+    john = Person.objects.create(name="John Smith", family_name="Smith")
+    john.identifiers.create(scheme="legid", identifier="456")
+    outsider = Person.objects.create(name="Outside Person")
+    for person in (jane, john):
+        Membership.objects.create(person=person, organization=house)
+    Membership.objects.create(
+        person=outsider, organization=Organization.objects.get(id="other-house")
+    )
+
+
+def _db_lookup(importer, pseudo_id):
+    spec = importer.limit_spec(get_pseudo_id(pseudo_id))
+    if isinstance(spec, dict):
+        return {o.id for o in importer.model_class.objects.filter(**spec)}
+    return {o.id for o in importer.model_class.objects.filter(spec)}
+
+
+PERSON_IDS = [
+    _make_pseudo_id(name="Jane Smith"),
+    _make_pseudo_id(name="J. Smith"),
+    _make_pseudo_id(name="Smith"),
+    _make_pseudo_id(name="Outside Person"),
+    _make_pseudo_id(name="Nobody"),
+    _make_pseudo_id(identifiers__scheme="legid", identifiers__identifier="123"),
+    _make_pseudo_id(identifiers__scheme="legid", identifiers__identifier="456"),
+    _make_pseudo_id(identifiers__scheme="other", identifiers__identifier="123"),
+]
+
+ORG_IDS = [
+    _make_pseudo_id(name="House"),
+    _make_pseudo_id(classification="lower"),
+    _make_pseudo_id(classification="upper", name="Senate"),
+    _make_pseudo_id(classification="upper", name="House"),
+    _make_pseudo_id(name="Finance"),
+    _make_pseudo_id(classification="party"),
+    _make_pseudo_id(classification="party", name="Democratic"),
+    _make_pseudo_id(classification="party", name="Republican"),
+    _make_pseudo_id(name="Democratic"),
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("pseudo_id", PERSON_IDS)
+def test_person_index_matches_query(pseudo_id):
+    create_data()
+    importer = PersonImporter("jid")
+    assert importer.lookup_pseudo_id(get_pseudo_id(pseudo_id)) == _db_lookup(
+        importer, pseudo_id
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("pseudo_id", ORG_IDS)
+def test_org_index_matches_query(pseudo_id):
+    create_data()
+    importer = OrganizationImporter("jid")
+    assert importer.lookup_pseudo_id(get_pseudo_id(pseudo_id)) == _db_lookup(
+        importer, pseudo_id
+    )
+
+
+@pytest.mark.django_db
+def test_resolve_from_index(django_assert_num_queries):
+    create_data()
+    importer = PersonImporter("jid")
+    # loading the index takes a fixed number of queries, resolving takes none
+    with django_assert_num_queries(3):
+        for pseudo_id in PERSON_IDS[:2] + PERSON_IDS[5:7]:
+            assert importer.resolve_json_id(pseudo_id)
+
+    # ambiguity is reported just like the query-based lookup
+    with pytest.raises(UnresolvedIdError):
+        importer.resolve_json_id(_make_pseudo_id(name="Smith"))
+    with pytest.raises(UnresolvedIdError):
+        importer.resolve_json_id(_make_pseudo_id(name="Outside Person"))
+    assert (
+        importer.resolve_json_id(_make_pseudo_id(name="Nobody"), allow_no_match=True)
+        is None
+    )
+
+
+@pytest.mark.django_db
+def test_unindexed_spec_uses_query():
+    create_data()
+    importer = OrganizationImporter("jid")
+    spec = {"name": "House", "parent_id": None}
+    assert importer.lookup_pseudo_id(spec) is None
+    assert importer.resolve_json_id(_make_pseudo_id(**spec)) == "house"
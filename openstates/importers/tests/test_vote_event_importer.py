@@ -1,6 +1,9 @@
 import pytest
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from openstates.scrape import VoteEvent as ScrapeVoteEvent, Bill as ScrapeBill
 from openstates.importers import VoteEventImporter, BillImporter
+from openstates.importers.base import JurisdictionCache
 from openstates.data.models import (
     Jurisdiction,
     Person,
@@ -10,6 +13,7 @@ from openstates.data.models import (
     LegislativeSession,
     Bill,
 )
+from openstates.reports.models import Identifier
 from openstates.utils.transformers import fix_bill_id
 
 
@@ -276,6 +280,44 @@ def test_vote_event_bill_clearing():
     assert VoteEvent.objects.count() == 2
 
 
+@pytest.mark.django_db
+def test_vote_event_bill_clearing_one_query():
+    create_jurisdiction()
+    bills = []
+    votes = []
+    for n in range(1, 4):
+        bills.append(ScrapeBill(f"HB {n}", "1900", "title", chamber="lower").as_dict())
+        for motion in ("passage", "amendment"):
+            votes.append(
+                ScrapeVoteEvent(
+                    legislative_session="1900",
+                    motion_text=motion,
+                    start_date="1900-04-01",
+                    classification="passage:bill",
+                    result="pass",
+                    bill_chamber="lower",
+                    bill=f"HB {n}",
+                    chamber="lower",
+                ).as_dict()
+            )
+    bi = BillImporter("jid")
+    bi.import_data(bills)
+    VoteEventImporter("jid", bi).import_data([dict(v) for v in votes])
+    assert VoteEvent.objects.count() == 6
+
+    # the amendment votes are gone from the second scrape
+    passage = [v for v in votes if v["motion_text"] == "passage"]
+    with CaptureQueriesContext(connection) as ctx:
+        VoteEventImporter("jid", bi).import_data(passage)
+    existing_queries = [
+        q
+        for q in ctx.captured_queries
+        if q["sql"].startswith('SELECT "opencivicdata_voteevent"."id" FROM')
+    ]
+    assert len(existing_queries) == 1
+    assert VoteEvent.objects.count() == 3
+
+
 @pytest.mark.django_db
 def test_vote_event_bill_actions():
     create_jurisdiction()
@@ -358,6 +400,42 @@ def test_vote_event_bill_actions():
     assert votes[("lower", "1900-04-02")] is None
 
 
+@pytest.mark.django_db
+def test_vote_event_bill_actions_one_query():
+    create_jurisdiction()
+    bill = ScrapeBill("HB 1", "1900", "Axe & Tack Tax Act", chamber="lower")
+    votes = []
+    for day in range(1, 6):
+        date = "1900-04-0{}".format(day)
+        bill.add_action(description="passage", date=date, chamber="lower")
+        votes.append(
+            ScrapeVoteEvent(
+                legislative_session="1900",
+                motion_text="passage",
+                start_date=date,
+                classification="passage:bill",
+                result="pass",
+                bill_chamber="lower",
+                bill="HB 1",
+                bill_action="passage",
+                chamber="lower",
+            ).as_dict()
+        )
+
+    bi = BillImporter("jid")
+    bi.import_data([bill.as_dict()])
+
+    with CaptureQueriesContext(connection) as ctx:
+        VoteEventImporter("jid", bi).import_data(votes)
+    action_queries = [
+        q
+        for q in ctx.captured_queries
+        if q["sql"].startswith('SELECT "opencivicdata_billaction"')
+    ]
+    assert len(action_queries) == 1
+    assert VoteEvent.objects.filter(bill_action__isnull=False).count() == 5
+
+
 @pytest.mark.django_db
 def test_vote_event_bill_actions_two_stage():
     # this test is very similar to what we're testing in test_vote_event_bill_actions w/
@@ -531,3 +609,168 @@ def test_fix_bill_id():
 
     ve = VoteEvent.objects.get()
     ve.bill.identifier == "HB 1"
+
+
+@pytest.mark.django_db
+def test_vote_event_pupa_ids_batched():
+    create_jurisdiction()
+    vote_events = []
+    for n in range(5):
+        ve = ScrapeVoteEvent(
+            legislative_session="1900",
+            motion_text="passage",
+            start_date="1900-04-01",
+            classification="passage:bill",
+            result="pass",
+            chamber="lower",
+            identifier=str(n),
+        )
+        ve.pupa_id = f"pupa-{n}"
+        vote_events.append(ve)
+
+    with CaptureQueriesContext(connection) as ctx:
+        VoteEventImporter("jid", DumbMockImporter()).import_data(
+            [ve.as_dict() for ve in vote_events]
+        )
+    identifier_queries = [
+        q["sql"] for q in ctx.captured_queries if '"pupa_identifier"' in q["sql"]
+    ]
+    # one query to load the existing ids, one to insert the new ones
+    assert len(identifier_queries) == 2
+    assert Identifier.objects.count() == 5
+
+    # a later import finds them without creating more
+    vote_events[0].motion_text = "amended passage"
+    VoteEventImporter("jid", DumbMockImporter()).import_data(
+        [ve.as_dict() for ve in vote_events]
+    )
+    assert Identifier.objects.count() == 5
+    assert VoteEvent.objects.count() == 5
+    assert VoteEvent.objects.get(identifier="0").motion_text == "amended passage"
+
+
+@pytest.mark.django_db
+def test_vote_event_pupa_ids_unique():
+    create_jurisdiction()
+
+    def _vote_event(identifier):
+        ve = ScrapeVoteEvent(
+            legislative_session="1900",
+            motion_text="passage",
+            start_date="1900-04-01",
+            classification="passage:bill",
+            result="pass",
+            chamber="lower",
+            identifier=identifier,
+        )
+        ve.pupa_id = "foo"
+        return ve.as_dict()
+
+    # another process loads the pupa_ids before the first one saves "foo"
+    cache = JurisdictionCache("jid")
+    other_cache = JurisdictionCache("jid")
+    other_cache.get_pupa_ids(VoteEvent)
+    VoteEventImporter("jid", DumbMockImporter(), cache).import_data([_vote_event("1")])
+    VoteEventImporter("jid", DumbMockImporter(), other_cache).import_data(
+        [_vote_event("2")]
+    )
+    # the first one to be saved wins
+    assert (
+        Identifier.objects.get().object_id == VoteEvent.objects.get(identifier="1").id
+    )
+
+    with pytest.raises(IntegrityError):
+        with transaction.atomic():
+            Identifier.objects.create(
+                identifier="foo",
+                jurisdiction_id="jid",
+                content_object=VoteEvent.objects.get(identifier="2"),
+            )
+
+    # importers sharing a cache don't load the pupa_ids again
+    with CaptureQueriesContext(connection) as ctx:
+        VoteEventImporter("jid", DumbMockImporter(), cache).import_data(
+            [_vote_event("1")]
+        )
+    assert not [q for q in ctx.captured_queries if '"pupa_identifier"' in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_shared_jurisdiction_cache():
+    create_jurisdiction()
+    bill = ScrapeBill("HB 1", "1900", "Axe & Tack Tax Act", chamber="lower")
+    vote_event = ScrapeVoteEvent(
+        legislative_session="1900",
+        motion_text="passage",
+        start_date="1900-04-01",
+        classification="passage:bill",
+        result="pass",
+        bill_chamber="lower",
+        bill="HB 1",
+        chamber="lower",
+    )
+
+    cache = JurisdictionCache("jid")
+    cache.load()
+    bi = BillImporter("jid", cache)
+    vi = VoteEventImporter("jid", bi, cache)
+    assert bi.org_importer.cache is cache
+    assert vi.person_importer.cache is cache
+
+    with CaptureQueriesContext(connection) as ctx:
+        bi.import_data([bill.as_dict()])
+        vi.import_data([vote_event.as_dict()])
+    session_queries = [
+        q["sql"]
+        for q in ctx.captured_queries
+        if 'FROM "opencivicdata_legislativesession"' in q["sql"]
+    ]
+    assert session_queries == []
+    # organizations are only loaded once for both importers
+    org_queries = [
+        q["sql"]
+        for q in ctx.captured_queries
+        if 'FROM "opencivicdata_organization"' in q["sql"]
+    ]
+    assert len(org_queries) == 1
+
+    session_id = LegislativeSession.objects.get().id
+    assert bi.get_seen_sessions() == {session_id}
+    assert vi.get_seen_sessions() == {session_id}
+    assert VoteEvent.objects.get().bill.identifier == "HB 1"
+
+
+@pytest.mark.django_db
+def test_edited_action_keeps_vote_link():
+    create_jurisdiction()
+
+    def _bill(description):
+        bill = ScrapeBill("HB 1", "1900", "Axe & Tack Tax Act", chamber="lower")
+        bill.add_action("introduced", date="1900-04-01", chamber="lower")
+        bill.add_action(description, date="1900-04-02", chamber="lower")
+        bill.add_action("signed", date="1900-04-03", chamber="lower")
+        return bill.as_dict()
+
+    vote_event = ScrapeVoteEvent(
+        legislative_session="1900",
+        motion_text="passage",
+        start_date="1900-04-02",
+        classification="passage:bill",
+        result="pass",
+        bill_chamber="lower",
+        bill="HB 1",
+        bill_action="passage",
+        chamber="lower",
+    )
+    bi = BillImporter("jid")
+    bi.import_data([_bill("passage")])
+    VoteEventImporter("jid", bi).import_data([vote_event.as_dict()])
+    action = VoteEvent.objects.get().bill_action
+    ids = [a.id for a in Bill.objects.get().actions.all()]
+
+    result = BillImporter("jid").import_data([_bill("passage (amended)")])
+    assert result["bill"]["update"] == 1
+    actions = list(Bill.objects.get().actions.all())
+    assert [a.id for a in actions] == ids
+    assert actions[1].description == "passage (amended)"
+    assert VoteEvent.objects.get().bill_action_id == action.id
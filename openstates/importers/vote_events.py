@@ -1,4 +1,6 @@
-from .base import BaseImporter
+from collections import defaultdict
+from .base import BaseImporter, chunks
+from .. import settings
 from ..utils import get_pseudo_id, _make_pseudo_id
 from ..exceptions import InvalidVoteEventError
 from ..data.models import VoteEvent, VoteCount, PersonVote, VoteSource, BillAction
@@ -15,15 +17,17 @@ class VoteEventImporter(BaseImporter):
         "sources": (VoteSource, "vote_event_id", {}),
     }
 
-    def __init__(self, jurisdiction_id, bill_importer):
+    def __init__(self, jurisdiction_id, bill_importer, cache=None):
 
-        super(VoteEventImporter, self).__init__(jurisdiction_id)
-        self.org_importer = OrganizationImporter(jurisdiction_id)
-        self.person_importer = PersonImporter(jurisdiction_id)
+        super(VoteEventImporter, self).__init__(jurisdiction_id, cache)
+        self.org_importer = OrganizationImporter(jurisdiction_id, self.cache)
+        self.person_importer = PersonImporter(jurisdiction_id, self.cache)
         self.bill_importer = bill_importer
         self.seen_bill_ids = set()
         self.seen_action_ids = set()
         self.vote_events_to_delete = set()
+        # bill_id -> {(description, date, organization_id): [(action id, has vote)]}
+        self.bill_actions = {}
 
     def get_object(self, vote_event):
         spec = {"legislative_session_id": vote_event["legislative_session_id"]}
@@ -65,6 +69,49 @@ class VoteEventImporter(BaseImporter):
 
         return self.model_class.objects.prefetch_related("votes__voter").get(**spec)
 
+    def preload(self, datas):
+        super(VoteEventImporter, self).preload(datas)
+        # find the existing vote events for all of the batch's bills at once, rather
+        # than as get_object sees each bill
+        bill_ids = {data["bill_id"] for data in datas if data["bill_id"]}
+        bill_ids -= self.seen_bill_ids
+        for bill_chunk in chunks(sorted(bill_ids), settings.IMPORT_BATCH_SIZE):
+            self.vote_events_to_delete.update(
+                self.model_class.objects.filter(bill_id__in=bill_chunk).values_list(
+                    "id", flat=True
+                )
+            )
+        self.seen_bill_ids.update(bill_ids)
+
+    def get_bill_action(self, bill_id, description, date, organization_id):
+        """
+        find a bill's action like BillAction.objects.get() would, but from an index of
+        the bill's actions that's loaded in one query the first time it is needed
+
+        returns (action id, whether the action already has a vote)
+        """
+        if bill_id not in self.bill_actions:
+            index = defaultdict(list)
+            actions = BillAction.objects.filter(bill_id=bill_id).values_list(
+                "id", "description", "date", "organization_id", "vote"
+            )
+            for action_id, a_description, a_date, a_org_id, vote_id in actions:
+                index[(a_description, a_date, a_org_id)].append(
+                    (action_id, vote_id is not None)
+                )
+            self.bill_actions[bill_id] = index
+
+        matches = self.bill_actions[bill_id].get((description, date, organization_id))
+        if not matches:
+            raise BillAction.DoesNotExist("BillAction matching query does not exist.")
+        elif len(matches) > 1:
+            raise BillAction.MultipleObjectsReturned(
+                "get() returned more than one BillAction -- it returned {}!".format(
+                    len(matches)
+                )
+            )
+        return matches[0]
+
     def limit_spec(self, spec):
         spec["legislative_session__jurisdiction_id"] = self.jurisdiction_id
         return spec
@@ -88,21 +135,21 @@ class VoteEventImporter(BaseImporter):
         bill_action = data.pop("bill_action")
         if bill_action:
             try:
-                action = BillAction.objects.get(
-                    bill_id=data["bill_id"],
-                    description=bill_action,
-                    date=data["start_date"],
-                    organization_id=data["organization_id"],
+                action_id, has_vote = self.get_bill_action(
+                    data["bill_id"],
+                    bill_action,
+                    data["start_date"],
+                    data["organization_id"],
                 )
                 # seen_action_ids is for ones being added in this import
-                # action.vote is already set if action was set on prior import
-                if action.id in self.seen_action_ids or hasattr(action, "vote"):
+                # has_vote is set if action was set on prior import
+                if action_id in self.seen_action_ids or has_vote:
                     self.warning(
-                        "can not match two VoteEvents to %s: %s", action.id, bill_action
+                        "can not match two VoteEvents to %s: %s", action_id, bill_action
                     )
                 else:
-                    data["bill_action_id"] = action.id
-                    self.seen_action_ids.add(action.id)
+                    data["bill_action_id"] = action_id
+                    self.seen_action_ids.add(action_id)
             except BillAction.DoesNotExist:
                 self.warning(
                     "could not match VoteEvent to %s %s %s",
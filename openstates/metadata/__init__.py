@@ -1,15 +1,24 @@
-from .data import STATES_BY_ABBR, STATES_BY_JID, STATES_BY_NAME
+import functools
+from . import data
+
+
+def __getattr__(name):
+    # STATES_BY_ABBR, etc. load every state, so only do it if they're used
+    if name in ("STATES_BY_ABBR", "STATES_BY_JID", "STATES_BY_NAME"):
+        return getattr(data, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def lookup(*, abbr=None, jurisdiction_id=None, name=None):
     if abbr:
-        return STATES_BY_ABBR[abbr.upper()]
+        return data.load(abbr.upper())
     if name:
-        return STATES_BY_NAME[name.lower()]
+        return data.load(data.NAME_TO_ABBR[name.lower()])
     if jurisdiction_id:
-        return STATES_BY_JID[jurisdiction_id]
+        return data.load(data.JID_TO_ABBR[jurisdiction_id])
 
 
+@functools.lru_cache(maxsize=None)
 def lookup_district_with_ancestors(*, division_id):
     pieces = division_id.split("/")
     if len(pieces) == 4:
@@ -1,114 +1,99 @@
-from .ak import AK
-from .al import AL
-from .ar import AR
-from .az import AZ
-from .ca import CA
-from .co import CO
-from .ct import CT
-from .dc import DC
-from .de import DE
-from .fl import FL
-from .ga import GA
-from .hi import HI
-from .ia import IA
-from .id import ID
-from .il import IL
-from .ind import IN
-from .ks import KS
-from .ky import KY
-from .la import LA
-from .ma import MA
-from .md import MD
-from .me import ME
-from .mi import MI
-from .mn import MN
-from .mo import MO
-from .ms import MS
-from .mt import MT
-from .nc import NC
-from .nd import ND
-from .ne import NE
-from .nh import NH
-from .nj import NJ
-from .nm import NM
-from .nv import NV
-from .ny import NY
-from .oh import OH
-from .ok import OK
-from .ore import OR
-from .pa import PA
-from .pr import PR
-from .ri import RI
-from .sc import SC
-from .sd import SD
-from .tn import TN
-from .tx import TX
-from .ut import UT
-from .va import VA
-from .vt import VT
-from .wa import WA
-from .wi import WI
-from .wv import WV
-from .wy import WY
-from .us import US
+"""
+metadata for each state, loaded on first use
 
+the index below is enough to look states up by abbreviation, jurisdiction id or name
+without importing every state's module (some of which hold large district tables)
+"""
+import importlib
 
-STATES = [
-    AK,
-    AL,
-    AR,
-    AZ,
-    CA,
-    CO,
-    CT,
-    DC,
-    DE,
-    FL,
-    GA,
-    HI,
-    IA,
-    ID,
-    IL,
-    IN,
-    KS,
-    KY,
-    LA,
-    MA,
-    MD,
-    ME,
-    MI,
-    MN,
-    MO,
-    MS,
-    MT,
-    NC,
-    ND,
-    NE,
-    NH,
-    NJ,
-    NM,
-    NV,
-    NY,
-    OH,
-    OK,
-    OR,
-    PA,
-    PR,
-    RI,
-    SC,
-    SD,
-    TN,
-    TX,
-    UT,
-    VA,
-    VT,
-    WA,
-    WI,
-    WV,
-    WY,
-    US,
+# (abbr, module, name, jurisdiction_id)
+INDEX = [
+    ("AK", "ak", "Alaska", "ocd-jurisdiction/country:us/state:ak/government"),
+    ("AL", "al", "Alabama", "ocd-jurisdiction/country:us/state:al/government"),
+    ("AR", "ar", "Arkansas", "ocd-jurisdiction/country:us/state:ar/government"),
+    ("AZ", "az", "Arizona", "ocd-jurisdiction/country:us/state:az/government"),
+    ("CA", "ca", "California", "ocd-jurisdiction/country:us/state:ca/government"),
+    ("CO", "co", "Colorado", "ocd-jurisdiction/country:us/state:co/government"),
+    ("CT", "ct", "Connecticut", "ocd-jurisdiction/country:us/state:ct/government"),
+    (
+        "DC",
+        "dc",
+        "District of Columbia",
+        "ocd-jurisdiction/country:us/district:dc/government",
+    ),
+    ("DE", "de", "Delaware", "ocd-jurisdiction/country:us/state:de/government"),
+    ("FL", "fl", "Florida", "ocd-jurisdiction/country:us/state:fl/government"),
+    ("GA", "ga", "Georgia", "ocd-jurisdiction/country:us/state:ga/government"),
+    ("HI", "hi", "Hawaii", "ocd-jurisdiction/country:us/state:hi/government"),
+    ("IA", "ia", "Iowa", "ocd-jurisdiction/country:us/state:ia/government"),
+    ("ID", "id", "Idaho", "ocd-jurisdiction/country:us/state:id/government"),
+    ("IL", "il", "Illinois", "ocd-jurisdiction/country:us/state:il/government"),
+    ("IN", "ind", "Indiana", "ocd-jurisdiction/country:us/state:in/government"),
+    ("KS", "ks", "Kansas", "ocd-jurisdiction/country:us/state:ks/government"),
+    ("KY", "ky", "Kentucky", "ocd-jurisdiction/country:us/state:ky/government"),
+    ("LA", "la", "Louisiana", "ocd-jurisdiction/country:us/state:la/government"),
+    ("MA", "ma", "Massachusetts", "ocd-jurisdiction/country:us/state:ma/government"),
+    ("MD", "md", "Maryland", "ocd-jurisdiction/country:us/state:md/government"),
+    ("ME", "me", "Maine", "ocd-jurisdiction/country:us/state:me/government"),
+    ("MI", "mi", "Michigan", "ocd-jurisdiction/country:us/state:mi/government"),
+    ("MN", "mn", "Minnesota", "ocd-jurisdiction/country:us/state:mn/government"),
+    ("MO", "mo", "Missouri", "ocd-jurisdiction/country:us/state:mo/government"),
+    ("MS", "ms", "Mississippi", "ocd-jurisdiction/country:us/state:ms/government"),
+    ("MT", "mt", "Montana", "ocd-jurisdiction/country:us/state:mt/government"),
+    ("NC", "nc", "North Carolina", "ocd-jurisdiction/country:us/state:nc/government"),
+    ("ND", "nd", "North Dakota", "ocd-jurisdiction/country:us/state:nd/government"),
+    ("NE", "ne", "Nebraska", "ocd-jurisdiction/country:us/state:ne/government"),
+    ("NH", "nh", "New Hampshire", "ocd-jurisdiction/country:us/state:nh/government"),
+    ("NJ", "nj", "New Jersey", "ocd-jurisdiction/country:us/state:nj/government"),
+    ("NM", "nm", "New Mexico", "ocd-jurisdiction/country:us/state:nm/government"),
+    ("NV", "nv", "Nevada", "ocd-jurisdiction/country:us/state:nv/government"),
+    ("NY", "ny", "New York", "ocd-jurisdiction/country:us/state:ny/government"),
+    ("OH", "oh", "Ohio", "ocd-jurisdiction/country:us/state:oh/government"),
+    ("OK", "ok", "Oklahoma", "ocd-jurisdiction/country:us/state:ok/government"),
+    ("OR", "ore", "Oregon", "ocd-jurisdiction/country:us/state:or/government"),
+    ("PA", "pa", "Pennsylvania", "ocd-jurisdiction/country:us/state:pa/government"),
+    ("PR", "pr", "Puerto Rico", "ocd-jurisdiction/country:us/territory:pr/government"),
+    ("RI", "ri", "Rhode Island", "ocd-jurisdiction/country:us/state:ri/government"),
+    ("SC", "sc", "South Carolina", "ocd-jurisdiction/country:us/state:sc/government"),
+    ("SD", "sd", "South Dakota", "ocd-jurisdiction/country:us/state:sd/government"),
+    ("TN", "tn", "Tennessee", "ocd-jurisdiction/country:us/state:tn/government"),
+    ("TX", "tx", "Texas", "ocd-jurisdiction/country:us/state:tx/government"),
+    ("UT", "ut", "Utah", "ocd-jurisdiction/country:us/state:ut/government"),
+    ("VA", "va", "Virginia", "ocd-jurisdiction/country:us/state:va/government"),
+    ("VT", "vt", "Vermont", "ocd-jurisdiction/country:us/state:vt/government"),
+    ("WA", "wa", "Washington", "ocd-jurisdiction/country:us/state:wa/government"),
+    ("WI", "wi", "Wisconsin", "ocd-jurisdiction/country:us/state:wi/government"),
+    ("WV", "wv", "West Virginia", "ocd-jurisdiction/country:us/state:wv/government"),
+    ("WY", "wy", "Wyoming", "ocd-jurisdiction/country:us/state:wy/government"),
+    ("US", "us", "United States", "ocd-jurisdiction/country:us/government"),
 ]
 
-STATES_BY_ABBR = {s.abbr: s for s in STATES}
-STATES_BY_JID = {s.jurisdiction_id: s for s in STATES}
-STATES_BY_NAME = {s.name.lower(): s for s in STATES}
+ABBRS = [abbr for abbr, _, _, _ in INDEX]
+ABBR_TO_MODULE = {abbr: module for abbr, module, _, _ in INDEX}
+ABBR_TO_JID = {abbr: jid for abbr, _, _, jid in INDEX}
+JID_TO_ABBR = {jid: abbr for abbr, _, _, jid in INDEX}
+NAME_TO_ABBR = {name.lower(): abbr for abbr, _, name, _ in INDEX}
+
+
+def load(abbr):
+    """ get a State, importing its module if needed """
+    module = importlib.import_module("." + ABBR_TO_MODULE[abbr], __name__)
+    return getattr(module, abbr)
+
+
+def __getattr__(name):
+    # the State objects (e.g. NC) and collections of all of them are built on access
+    if name in ABBR_TO_MODULE:
+        return load(name)
+    elif name == "STATES":
+        value = [load(abbr) for abbr in ABBRS]
+    elif name == "STATES_BY_ABBR":
+        value = {abbr: load(abbr) for abbr in ABBRS}
+    elif name == "STATES_BY_JID":
+        value = {jid: load(abbr) for jid, abbr in JID_TO_ABBR.items()}
+    elif name == "STATES_BY_NAME":
+        value = {name: load(abbr) for name, abbr in NAME_TO_ABBR.items()}
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
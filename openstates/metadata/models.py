@@ -19,13 +19,29 @@ class Chamber:
     num_seats: int
     organization_id: str
     districts: typing.List[District]
+    # indexes of districts, built on first lookup
+    _districts_by_division_id: dict = attr.ib(
+        default=None, init=False, eq=False, repr=False
+    )
+    _districts_by_name: dict = attr.ib(default=None, init=False, eq=False, repr=False)
 
     def lookup_district(self, division_id=None, *, name=None):
-        for d in self.districts:
-            if division_id and d.division_id == division_id:
-                return d
-            if name and d.name == name:
-                return d
+        if self._districts_by_division_id is None:
+            self._districts_by_division_id = {}
+            self._districts_by_name = {}
+            for d in self.districts:
+                self._districts_by_division_id.setdefault(d.division_id, d)
+                self._districts_by_name.setdefault(d.name, d)
+
+        by_division_id = by_name = None
+        if division_id:
+            by_division_id = self._districts_by_division_id.get(division_id)
+        if name:
+            by_name = self._districts_by_name.get(name)
+        if by_division_id and by_name:
+            # both matched, return whichever comes first like a scan would
+            return min(by_division_id, by_name, key=self.districts.index)
+        return by_division_id or by_name
 
 
 @attr.s(auto_attribs=True)
@@ -1,4 +1,5 @@
 import re
+from .. import data
 from ..data import STATES, NC, VT
 
 
@@ -20,6 +21,15 @@ def test_basics():
     assert bicam_count == 51
 
 
+def test_index_matches_states():
+    for abbr, _, name, jurisdiction_id in data.INDEX:
+        state = data.load(abbr)
+        assert state.abbr == abbr
+        assert state.name == name
+        assert state.jurisdiction_id == jurisdiction_id
+    assert len(data.INDEX) == len(STATES)
+
+
 def test_district_numbers():
     for state in STATES:
         if state.unicameral:
@@ -1,6 +1,6 @@
 import pytest
 from .. import lookup, lookup_district_with_ancestors
-from ..data import NC, NE
+from ..data import ABBRS, NC, NE
 
 
 def test_lookup():
@@ -103,3 +103,18 @@ def test_lookup_district_with_ancestors_dc_pr():
     assert state.name == "Puerto Rico"
     assert chamber.chamber_type == "upper"
     assert district.name == "At-Large"
+
+
+def test_lookup_district_matches_scan():
+    for abbr in ABBRS:
+        for chamber in lookup(abbr=abbr).chambers:
+            for district in chamber.districts:
+                # what lookup_district used to do, first match wins
+                by_division_id = next(
+                    d
+                    for d in chamber.districts
+                    if d.division_id == district.division_id
+                )
+                by_name = next(d for d in chamber.districts if d.name == district.name)
+                assert chamber.lookup_district(district.division_id) is by_division_id
+                assert chamber.lookup_district(name=district.name) is by_name
@@ -0,0 +1,32 @@
+# Generated by Django 3.2.25 on 2026-10-17 07:26
+
+from django.db import migrations, models
+
+
+# keep the first of any duplicate pupa_ids, which the constraint below won't allow
+DELETE_DUPLICATES_SQL = """
+DELETE FROM pupa_identifier AS dupe
+USING pupa_identifier AS first
+WHERE dupe.jurisdiction_id = first.jurisdiction_id
+    AND dupe.content_type_id = first.content_type_id
+    AND dupe.identifier = first.identifier
+    AND dupe.id > first.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_DUPLICATES_SQL, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name="identifier",
+            constraint=models.UniqueConstraint(
+                fields=("jurisdiction", "content_type", "identifier"),
+                name="unique_pupa_identifier",
+            ),
+        ),
+    ]
@@ -82,6 +82,12 @@ class Identifier(models.Model):
 
     class Meta:
         db_table = "pupa_identifier"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["jurisdiction", "content_type", "identifier"],
+                name="unique_pupa_identifier",
+            )
+        ]
 
 
 class SessionDataQualityReport(models.Model):
@@ -1,10 +1,15 @@
 import os
+import gzip
 import importlib
 import json
 import uuid
+import queue
+import inspect
 import logging
 import datetime
-from collections import defaultdict, OrderedDict
+import threading
+from collections import defaultdict, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import jsonschema
 from jsonschema import Draft3Validator, FormatChecker
@@ -66,6 +71,78 @@ def clean_whitespace(obj):
     return obj
 
 
+_type_checker = Draft3Validator.TYPE_CHECKER.redefine(
+    "datetime", lambda c, d: isinstance(d, (datetime.date, datetime.datetime))
+)
+_type_checker = _type_checker.redefine(
+    "date",
+    lambda c, d: (
+        isinstance(d, datetime.date) and not isinstance(d, datetime.datetime)
+    ),
+)
+ScrapeValidator = jsonschema.validators.extend(
+    Draft3Validator, type_checker=_type_checker
+)
+
+# id(schema) -> (schema, validator), the schema is kept so its id can't be reused
+_validators = {}
+
+
+def get_validator(schema):
+    """ get a (cached) validator for one of the scrape schemas """
+    try:
+        return _validators[id(schema)][1]
+    except KeyError:
+        validator = ScrapeValidator(schema, format_checker=FormatChecker())
+        _validators[id(schema)] = (schema, validator)
+        return validator
+
+
+class BackgroundWriter:
+    """
+    calls func with queued arguments on a separate thread
+
+    the first exception func raises is re-raised on the calling thread by the next
+    put() or close(), anything queued after it is discarded
+    """
+
+    def __init__(self, func, maxsize=100):
+        self.func = func
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.error = None
+        self.failed = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            args = self.queue.get()
+            if args is None:
+                return
+            if self.failed:
+                continue
+            try:
+                self.func(*args)
+            except BaseException as e:
+                self.error = e
+                self.failed = True
+
+    def _check(self):
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+    def put(self, *args):
+        self._check()
+        self.queue.put(args)
+
+    def close(self):
+        """ wait for all queued calls to finish """
+        self.queue.put(None)
+        self.thread.join()
+        self._check()
+
+
 class Scraper(scrapelib.Scraper):
     """ Base class for all scrapers """
 
@@ -73,6 +150,7 @@ class Scraper(scrapelib.Scraper):
         self, jurisdiction, datadir, *, strict_validation=True, fastmode=False
     ):
         super(Scraper, self).__init__()
+        self._throttle_lock = threading.Lock()
 
         # set options
         self.jurisdiction = jurisdiction
@@ -98,6 +176,10 @@ class Scraper(scrapelib.Scraper):
 
         # 'type' -> {set of names}
         self.output_names = defaultdict(set)
+        # 'type' -> open .jsonl file
+        self.output_files = {}
+        # writes objects in the background during do_scrape if SCRAPE_WRITER_THREAD
+        self.writer = None
 
         # logging convenience methods
         self.logger = logging.getLogger("openstates")
@@ -114,6 +196,11 @@ class Scraper(scrapelib.Scraper):
             handler = importlib.import_module(modname)
             self.scrape_output_handler = handler.Handler(self)
 
+    def _throttle(self):
+        # requests may be made from several threads, keep them within one budget
+        with self._throttle_lock:
+            super(Scraper, self)._throttle()
+
     def save_object(self, obj):
         """
         Save object to disk as JSON.
@@ -125,47 +212,107 @@ class Scraper(scrapelib.Scraper):
 
         filename = "{0}_{1}.json".format(obj._type, obj._id).replace("/", "-")
 
-        self.info("save %s %s as %s", obj._type, obj, filename)
-        self.debug(
-            json.dumps(
-                OrderedDict(sorted(obj.as_dict().items())),
-                cls=utils.JSONEncoderPlus,
-                indent=4,
-                separators=(",", ": "),
+        if settings.SCRAPE_OUTPUT_FORMAT == "json":
+            self.info("save %s %s as %s", obj._type, obj, filename)
+        else:
+            self.info(
+                "save %s %s to %s.%s",
+                obj._type,
+                obj,
+                obj._type,
+                settings.SCRAPE_OUTPUT_FORMAT,
             )
-        )
-
+        data = obj.as_dict()
         self.output_names[obj._type].add(filename)
 
-        if self.scrape_output_handler is None:
-            with open(os.path.join(self.datadir, filename), "w") as f:
-                json.dump(obj.as_dict(), f, cls=utils.JSONEncoderPlus)
+        if self.writer is None:
+            self.write_object(obj, data, filename)
         else:
+            self.writer.put(obj, data, filename)
+
+        # after saving and validating, save subordinate objects
+        for obj in obj._related:
+            self.save_object(obj)
+
+    def write_object(self, obj, data, filename):
+        """ write out & validate an object that save_object has prepared """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.debug(
+                json.dumps(
+                    OrderedDict(sorted(data.items())),
+                    cls=utils.JSONEncoderPlus,
+                    indent=4,
+                    separators=(",", ": "),
+                )
+            )
+
+        if self.scrape_output_handler is not None:
             self.scrape_output_handler.handle(obj)
+        elif settings.SCRAPE_OUTPUT_FORMAT == "json":
+            with open(os.path.join(self.datadir, filename), "w") as f:
+                json.dump(data, f, cls=utils.JSONEncoderPlus)
+        else:
+            f = self.get_output_file(obj._type)
+            f.write(json.dumps(data, cls=utils.JSONEncoderPlus))
+            f.write("\n")
 
         # validate after writing, allows for inspection on failure
         try:
-            obj.validate()
+            obj.validate(data=data)
         except ValueError as ve:
             if self.strict_validation:
                 raise ve
             else:
                 self.warning(ve)
 
-        # after saving and validating, save subordinate objects
-        for obj in obj._related:
-            self.save_object(obj)
+    def get_output_file(self, _type):
+        """ get the (append mode) JSON Lines file objects of _type are written to """
+        if _type not in self.output_files:
+            filename = os.path.join(
+                self.datadir, "{}.{}".format(_type, settings.SCRAPE_OUTPUT_FORMAT)
+            )
+            if filename.endswith(".gz"):
+                self.output_files[_type] = gzip.open(filename, "at")
+            else:
+                self.output_files[_type] = open(filename, "a")
+        return self.output_files[_type]
+
+    def close_output_files(self):
+        for f in self.output_files.values():
+            f.close()
+        self.output_files = {}
+
+    def close_writer(self):
+        """ wait for the background writer (if any) and close the output files """
+        try:
+            if self.writer is not None:
+                self.writer.close()
+        finally:
+            self.writer = None
+            self.close_output_files()
 
     def do_scrape(self, **kwargs):
         record = {"objects": defaultdict(int)}
         self.output_names = defaultdict(set)
         record["start"] = utils.utcnow()
-        for obj in self.scrape(**kwargs) or []:
-            if hasattr(obj, "__iter__"):
-                for iterobj in obj:
-                    self.save_object(iterobj)
-            else:
-                self.save_object(obj)
+        if settings.SCRAPE_WRITER_THREAD:
+            self.writer = BackgroundWriter(self.write_object)
+        try:
+            for obj in self.scrape(**kwargs) or []:
+                if hasattr(obj, "__iter__"):
+                    for iterobj in obj:
+                        self.save_object(iterobj)
+                else:
+                    self.save_object(obj)
+        except BaseException:
+            # the scrape's own error is the one to report, not a follow-on write error
+            try:
+                self.close_writer()
+            except Exception:
+                self.logger.exception("error closing writer after failed scrape")
+            raise
+        else:
+            self.close_writer()
         record["end"] = utils.utcnow()
         record["skipped"] = getattr(self, "skipped", 0)
         if not self.output_names:
@@ -188,6 +335,8 @@ class Scraper(scrapelib.Scraper):
 
 class BaseBillScraper(Scraper):
     skipped = 0
+    # number of bills to fetch at once, requests still share requests_per_minute
+    concurrent_requests = 1
 
     class ContinueScraping(Exception):
         """ indicate that scraping should continue without saving an object """
@@ -196,6 +345,10 @@ class BaseBillScraper(Scraper):
 
     def scrape(self, legislative_session, **kwargs):
         self.legislative_session = legislative_session
+        if self.concurrent_requests > 1:
+            yield from self.scrape_concurrently(**kwargs)
+            return
+
         for bill_id, extras in self.get_bill_ids(**kwargs):
             try:
                 yield self.get_bill(bill_id, **extras)
@@ -204,6 +357,36 @@ class BaseBillScraper(Scraper):
                 self.skipped += 1
                 continue
 
+    def scrape_concurrently(self, **kwargs):
+        """
+        call get_bill from a pool of threads, yielding the results in order
+
+        objects are still saved (and skips counted) on the calling thread
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrent_requests) as pool:
+            pending = deque()
+            for bill_id, extras in self.get_bill_ids(**kwargs):
+                future = pool.submit(self._get_bill, bill_id, extras)
+                pending.append((bill_id, future))
+                if len(pending) >= self.concurrent_requests * 2:
+                    yield from self._bill_result(*pending.popleft())
+            while pending:
+                yield from self._bill_result(*pending.popleft())
+
+    def _get_bill(self, bill_id, extras):
+        result = self.get_bill(bill_id, **extras)
+        # run generators to completion so that their requests happen in the worker
+        if inspect.isgenerator(result):
+            result = list(result)
+        return result
+
+    def _bill_result(self, bill_id, future):
+        try:
+            yield future.result()
+        except self.ContinueScraping as exc:
+            self.warning("skipping %s: %r", bill_id, exc)
+            self.skipped += 1
+
 
 class BaseModel(object):
     """
@@ -224,10 +407,12 @@ class BaseModel(object):
 
     # validation
 
-    def validate(self, schema=None):
+    def validate(self, schema=None, data=None):
         """
         Validate that we have a valid object.
 
+        data may be passed if the object has already been converted with as_dict().
+
         On error, this will raise a `ScrapeValueError`
 
         This also expects that the schemas assume that omitting required
@@ -239,22 +424,11 @@ class BaseModel(object):
         if schema is None:
             schema = self._schema
 
-        type_checker = Draft3Validator.TYPE_CHECKER.redefine(
-            "datetime", lambda c, d: isinstance(d, (datetime.date, datetime.datetime))
-        )
-        type_checker = type_checker.redefine(
-            "date",
-            lambda c, d: (
-                isinstance(d, datetime.date) and not isinstance(d, datetime.datetime)
-            ),
-        )
-
-        ValidatorCls = jsonschema.validators.extend(
-            Draft3Validator, type_checker=type_checker
-        )
-        validator = ValidatorCls(schema, format_checker=FormatChecker())
+        validator = get_validator(schema)
+        if data is None:
+            data = self.as_dict()
 
-        errors = [str(error) for error in validator.iter_errors(self.as_dict())]
+        errors = [str(error) for error in validator.iter_errors(data)]
         if errors:
             raise ScrapeValueError(
                 "validation of {} {} failed: {}".format(
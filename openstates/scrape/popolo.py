@@ -250,7 +250,7 @@ class Organization(BaseModel, SourceMixin, LinkMixin):
     def __str__(self):
         return self.name
 
-    def validate(self):
+    def validate(self, data=None):
         schema = None
         # these are implicitly declared & do not require sources
         if self.classification in (
@@ -261,7 +261,7 @@ class Organization(BaseModel, SourceMixin, LinkMixin):
             "executive",
         ):
             schema = org_schema_no_sources
-        return super(Organization, self).validate(schema=schema)
+        return super(Organization, self).validate(schema=schema, data=data)
 
     def add_post(self, label, role, **kwargs):
         post = Post(label=label, role=role, organization_id=self._id, **kwargs)
@@ -8,7 +8,9 @@ from openstates.scrape.base import (
     AssociatedLinkMixin,
     OtherNameMixin,
     IdentifierMixin,
+    get_validator,
 )
+from openstates.scrape.popolo import org_schema_no_sources
 
 
 class GenericModel(
@@ -40,6 +42,11 @@ def test_as_dict():
     assert m.as_dict()["_id"] == m._id
 
 
+def test_validator_cached():
+    assert get_validator(schema) is get_validator(schema)
+    assert get_validator(org_schema_no_sources) is not get_validator(schema)
+
+
 def test_setattr():
     m = GenericModel()
 
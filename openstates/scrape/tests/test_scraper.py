@@ -1,5 +1,9 @@
+import os
 import pytest
+import tempfile
 from unittest import mock
+from openstates import settings
+from openstates.importers.base import json_stream
 from openstates.scrape import Person, Organization, Bill, Jurisdiction
 from openstates.scrape.base import Scraper, ScrapeError, BaseBillScraper
 
@@ -26,6 +30,24 @@ def test_save_object_basics():
     json_dump.assert_called_once_with(p.as_dict(), mock.ANY, cls=mock.ANY)
 
 
+def test_save_object_serializes_once():
+    s = Scraper(juris, "/tmp/")
+    p = Person("Michael Jordan")
+    p.add_source("http://example.com")
+
+    as_dict = mock.patch.object(
+        Person, "as_dict", autospec=True, side_effect=Person.as_dict
+    )
+    debug_disabled = mock.patch.object(s.logger, "isEnabledFor", return_value=False)
+    with as_dict as as_dict, debug_disabled, mock.patch("json.dump"):
+        with mock.patch("json.dumps") as json_dumps:
+            s.save_object(p)
+
+    assert as_dict.call_count == 1
+    # the indented debug dump is skipped when DEBUG isn't enabled
+    assert json_dumps.call_count == 0
+
+
 def test_save_object_invalid():
     s = Scraper(juris, "/tmp/")
     p = Person("Michael Jordan")
@@ -68,6 +90,91 @@ def test_simple_scrape():
     assert record["skipped"] == 0
 
 
+@pytest.mark.parametrize("output_format", ["jsonl", "jsonl.gz"])
+def test_jsonl_scrape(output_format):
+    class FakeScraper(Scraper):
+        def scrape(self):
+            for name in ("Michael Jordan", "Scottie Pippen"):
+                p = Person(name)
+                p.add_source("http://example.com")
+                yield p
+
+    orig = settings.SCRAPE_OUTPUT_FORMAT
+    settings.SCRAPE_OUTPUT_FORMAT = output_format
+    try:
+        with tempfile.TemporaryDirectory() as datadir:
+            record = FakeScraper(juris, datadir).do_scrape()
+            assert os.listdir(datadir) == ["person." + output_format]
+            people = list(json_stream(datadir, "person"))
+    finally:
+        settings.SCRAPE_OUTPUT_FORMAT = orig
+
+    assert record["objects"]["person"] == 2
+    assert [p["name"] for p in people] == ["Michael Jordan", "Scottie Pippen"]
+
+
+def test_writer_thread_scrape():
+    class FakeScraper(Scraper):
+        def scrape(self):
+            for name in ("Michael Jordan", "Scottie Pippen"):
+                p = Person(name)
+                p.add_source("http://example.com")
+                yield p
+
+    orig = settings.SCRAPE_WRITER_THREAD
+    settings.SCRAPE_WRITER_THREAD = True
+    try:
+        with mock.patch("json.dump") as json_dump:
+            record = FakeScraper(juris, "/tmp/").do_scrape()
+    finally:
+        settings.SCRAPE_WRITER_THREAD = orig
+
+    assert [call[1][0]["name"] for call in json_dump.mock_calls] == [
+        "Michael Jordan",
+        "Scottie Pippen",
+    ]
+    assert record["objects"]["person"] == 2
+
+
+def test_writer_thread_validation_error():
+    class FakeScraper(Scraper):
+        def scrape(self):
+            # no source, won't validate
+            yield Person("Michael Jordan")
+
+    orig = settings.SCRAPE_WRITER_THREAD
+    settings.SCRAPE_WRITER_THREAD = True
+    try:
+        scraper = FakeScraper(juris, "/tmp/")
+        with mock.patch("json.dump"):
+            with pytest.raises(ValueError):
+                scraper.do_scrape()
+    finally:
+        settings.SCRAPE_WRITER_THREAD = orig
+
+    assert scraper.writer is None
+
+
+def test_writer_thread_keeps_scrape_error():
+    class FakeScraper(Scraper):
+        def scrape(self):
+            # no source, the writer will fail too
+            yield Person("Michael Jordan")
+            raise RuntimeError("scraper bug")
+
+    orig = settings.SCRAPE_WRITER_THREAD
+    settings.SCRAPE_WRITER_THREAD = True
+    try:
+        scraper = FakeScraper(juris, "/tmp/")
+        with mock.patch("json.dump"):
+            with pytest.raises(RuntimeError, match="scraper bug"):
+                scraper.do_scrape()
+    finally:
+        settings.SCRAPE_WRITER_THREAD = orig
+
+    assert scraper.writer is None
+
+
 def test_double_iter():
     """ tests that scrapers that yield iterables work OK """
 
@@ -130,6 +237,32 @@ def test_bill_scraper():
     assert record["skipped"] == 1
 
 
+def test_concurrent_bill_scraper():
+    class BillScraper(BaseBillScraper):
+        concurrent_requests = 3
+
+        def get_bill_ids(self):
+            for n in range(20):
+                yield str(n), {}
+
+        def get_bill(self, bill_id):
+            if int(bill_id) % 5 == 0:
+                raise self.ContinueScraping
+            b = Bill(bill_id, self.legislative_session, "title")
+            b.add_source("http://example.com")
+            # generators are run in the worker threads
+            yield b
+
+    bs = BillScraper(juris, "/tmp/")
+    with mock.patch("json.dump") as json_dump:
+        record = bs.do_scrape(legislative_session="2020")
+
+    saved = [call[1][0]["identifier"] for call in json_dump.mock_calls]
+    assert saved == [str(n) for n in range(20) if n % 5]
+    assert record["objects"]["bill"] == 16
+    assert record["skipped"] == 4
+
+
 def test_whitespace_is_stripped():
     s = Scraper(juris, "/tmp/")
     b = Bill(" HB 11", "2020", " a short title     ")
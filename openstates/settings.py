@@ -12,6 +12,12 @@ SCRAPELIB_VERIFY = True
 CACHE_DIR = os.path.join(os.getcwd(), "_cache")
 SCRAPED_DATA_DIR = os.path.join(os.getcwd(), "_data")
 
+# "json" writes a file per object, "jsonl" or "jsonl.gz" append to one file per type
+SCRAPE_OUTPUT_FORMAT = "json"
+
+# write & validate scraped objects on a background thread
+SCRAPE_WRITER_THREAD = False
+
 # import settings
 
 ENABLE_BILLS = True
@@ -21,6 +27,30 @@ ENABLE_EVENTS = False
 
 IMPORT_TRANSFORMERS = {"bill": {"identifier": transformers.fix_bill_id}}
 
+# number of threads decoding JSON files ahead of the importer (0 to decode inline)
+IMPORT_DECODE_WORKERS = 4
+
+# number of processes used to import bills & votes, one legislative session at a time
+IMPORT_WORKERS = 1
+
+# number of items prepared & looked up together during import
+IMPORT_BATCH_SIZE = 500
+
+# skip comparing objects whose scraped data matches the hash stored on the last import
+# (turn off to repair objects that were changed in the database since then)
+IMPORT_SKIP_UNCHANGED = True
+
+# only delete/create the related objects that changed, instead of replacing them all
+IMPORT_DIFF_RELATED = True
+
+# resolve people & organization pseudo ids from an index of the jurisdiction's
+# people/organizations loaded in one query, instead of querying for each one
+IMPORT_PRELOAD_PSEUDO_IDS = True
+
+# related objects of a single type are inserted with COPY when an import batch has more
+# than this many of them (None to always use bulk_create)
+IMPORT_COPY_THRESHOLD = 1000
+
 # Django settings
 LOGGING = {
     "version": 1,
@@ -2,8 +2,8 @@ from .. import metadata
 
 
 def jid_to_abbr(jid):
-    return metadata.lookup(jurisdiction_id=jid).abbr.lower()
+    return metadata.data.JID_TO_ABBR[jid].lower()
 
 
 def abbr_to_jid(abbr):
-    return metadata.lookup(abbr=abbr).jurisdiction_id
+    return metadata.data.ABBR_TO_JID[abbr.upper()]
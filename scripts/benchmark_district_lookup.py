@@ -0,0 +1,40 @@
+"""
+compare district lookups against a linear scan of a chamber's districts
+
+    python scripts/benchmark_district_lookup.py [abbr]
+"""
+import sys
+import timeit
+from openstates.metadata import lookup, lookup_district_with_ancestors
+
+
+def main(abbr="nh", repeat=10):
+    state = lookup(abbr=abbr)
+    division_ids = [d.division_id for c in state.chambers for d in c.districts]
+
+    def scan():
+        for division_id in division_ids:
+            next(
+                d
+                for c in state.chambers
+                for d in c.districts
+                if d.division_id == division_id
+            )
+
+    def indexed():
+        for division_id in division_ids:
+            state.lookup_district(division_id)
+
+    def with_ancestors():
+        for division_id in division_ids:
+            lookup_district_with_ancestors(division_id=division_id)
+
+    n = len(division_ids) * repeat
+    print("{} lookups in {}".format(n, state.name))
+    for func in (scan, indexed, with_ancestors):
+        seconds = timeit.timeit(func, number=repeat)
+        print("{:>15}: {:.0f}/s".format(func.__name__, n / seconds))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])